@@ -1,3 +1,4 @@
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 
@@ -43,6 +44,7 @@ class Settings(BaseSettings):
     VLLM_BASE_URL: str = "http://localhost:8000"
     VLLM_MODEL: str = "Qwen/Qwen2.5-Coder-7B-Instruct"
     VLLM_TIMEOUT: int = 120
+    VLLM_PRETOKENIZE: bool = False  # send token ids (needs transformers)
     
     # API Configuration
     WORKERS: int = 4
@@ -58,7 +60,7 @@ class Settings(BaseSettings):
     GRAFANA_ADMIN_USER: str = "admin"
     GRAFANA_ADMIN_PASSWORD: str = "admin"
     
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         """Convert CORS_ORIGINS string to list."""
         if self.CORS_ORIGINS == "*":
@@ -78,4 +80,9 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide default Settings, built once."""
+    return Settings()
+
+settings = get_settings()
@@ -1,8 +1,10 @@
 from celery import Celery
 from redis import Redis
 from typing import Dict, Any, Optional
+import asyncio
 import json
 import logging
+import threading
 from datetime import datetime
 
 from .config import settings
@@ -30,6 +32,20 @@ celery_app.conf.update(
     worker_max_tasks_per_child=100,  # Restart worker after 100 tasks
 )
 
+# One event loop per worker thread, kept across tasks so the worker
+# singletons (and their pooled HTTP clients) are reused between tasks
+_thread_state = threading.local()
+
+
+def _run_async(coro):
+    """Run a coroutine to completion on this thread's persistent event loop"""
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
 # Redis client for queue management
 redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
 
@@ -278,7 +294,6 @@ def _run_ollama_inference(task_payload: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Inference result
     """
-    import asyncio
     import sys
     
     # Add workers directory to path
@@ -298,13 +313,7 @@ def _run_ollama_inference(task_payload: Dict[str, Any]) -> Dict[str, Any]:
         return await worker.inference(task_payload["data"])
     
     # Run async function in sync context
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(run_inference())
-        return result
-    finally:
-        loop.close()
+    return _run_async(run_inference())
 
 
 def _run_vllm_inference(task_payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -317,7 +326,6 @@ def _run_vllm_inference(task_payload: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Inference result
     """
-    import asyncio
     import sys
     
     # Add workers directory to path
@@ -332,18 +340,13 @@ def _run_vllm_inference(task_payload: Dict[str, Any]) -> Dict[str, Any]:
         worker = await get_vllm_worker(
             base_url=settings.VLLM_BASE_URL,
             model=settings.VLLM_MODEL,
-            timeout=settings.VLLM_TIMEOUT
+            timeout=settings.VLLM_TIMEOUT,
+            pretokenize=settings.VLLM_PRETOKENIZE
         )
         return await worker.inference(task_payload["data"])
     
     # Run async function in sync context
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(run_inference())
-        return result
-    finally:
-        loop.close()
+    return _run_async(run_inference())
 
 
 def _run_ray_inference(task_payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -56,6 +56,8 @@ OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "120"))
 VLLM_BASE_URL = os.getenv("VLLM_BASE_URL", "http://localhost:8001")
 VLLM_MODEL = os.getenv("VLLM_MODEL", "Qwen/Qwen2.5-Coder-7B-Instruct")
 VLLM_TIMEOUT = int(os.getenv("VLLM_TIMEOUT", "120"))
+# Coalesce concurrent vLLM generate calls into batched requests (opt-in)
+VLLM_MICROBATCH = os.getenv("VLLM_MICROBATCH", "false").lower() == "true"
 
 INFERENCE_MODE = os.getenv("INFERENCE_MODE", "local")
 MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "5"))
@@ -76,7 +78,8 @@ async def get_worker():
         return await get_vllm_worker(
             base_url=VLLM_BASE_URL,
             model=VLLM_MODEL,
-            timeout=VLLM_TIMEOUT
+            timeout=VLLM_TIMEOUT,
+            microbatch=VLLM_MICROBATCH
         )
     else:
         return await get_ollama_worker(
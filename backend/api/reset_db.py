@@ -4,8 +4,8 @@ from sqlalchemy import text
 from app.database import engine, Base
 from app.config import settings
 import alembic.config
+from alembic import command
 import os
-import subprocess
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,8 +26,9 @@ def ensure_alembic_setup():
     if not os.path.exists(alembic_cfg_path):
         logger.warning("alembic.ini not found. Initializing Alembic...")
         try:
-            # Initialize Alembic
-            subprocess.run(["alembic", "init", "migrations"], cwd=current_dir, check=True)
+            # Initialize Alembic in-process (no `alembic` CLI subprocess needed)
+            alembic_cfg = alembic.config.Config(alembic_cfg_path)
+            command.init(alembic_cfg, directory=migrations_dir, template="generic")
             logger.info("Alembic initialized successfully.")
             
             # Update alembic.ini with correct database URL
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Integration Test Runner
+
+Runs the standalone integration scripts (mock vLLM batching and Ollama)
+on a single event loop with one shared aiohttp session. The independent
+probes (API health, Ollama health) run concurrently, then the dependent
+test stages run in order.
+
+Prerequisites:
+1. Mock vLLM server: uvicorn mock_vllm:app --port 8000
+2. Ollama (optional): the Ollama stage is skipped if it is not reachable
+
+Usage:
+    python run_integration_tests.py
+"""
+
+import asyncio
+import aiohttp
+
+import test_batching
+import test_ollama_simple
+import test_ollama_worker
+
+
+async def run_suite():
+    """Run all integration tests as coroutines on one event loop"""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=100, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, json_serialize=test_batching.orjson_dumps) as session, test_batching.log_printer():
+        # Independent probes: overlap their round trips
+        health, ollama_ok = await asyncio.gather(
+            test_batching.test_health_async(session),
+            test_ollama_simple.test_ollama_health_async(session),
+            return_exceptions=True,
+        )
+
+        # Dependent stages
+        if isinstance(health, BaseException):
+            print(f"\n✗ Skipping batching tests: cannot reach {test_batching.BASE_URL} ({health})")
+        else:
+            await test_batching.run_batching_stages(session)
+
+        if ollama_ok is True:
+            await test_ollama_simple.run_ollama_stages(session)
+            await test_ollama_worker.test_ollama_worker()
+        else:
+            print("\n✗ Skipping Ollama tests: Ollama is not ready")
+
+def main():
+    """Run the integration suite"""
+    print("\n" + "=" * 70)
+    print("  INTEGRATION TEST SUITE")
+    print("=" * 70)
+
+    asyncio.run(run_suite())
+
+    print("\n" + "=" * 70)
+    print("  ✓ INTEGRATION SUITE FINISHED")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
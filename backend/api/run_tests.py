@@ -10,11 +10,14 @@ Usage:
     python run_tests.py -v           # Verbose output
     python run_tests.py -k test_auth # Run specific test
     python run_tests.py --cov        # With coverage report
+    python run_tests.py -n 0         # Disable pytest-xdist parallelism
+    python run_tests.py --no-inprocess  # Run pytest in a separate subprocess
 """
 
 import sys
 import subprocess
 import os
+import importlib.util
 
 def main():
     """Run pytest with appropriate arguments."""
@@ -31,12 +34,17 @@ def main():
         print("  pip install -r requirements-test.txt")
         return 1
     
+    # Run pytest in-process unless subprocess isolation is requested
+    script_args = sys.argv[1:]
+    in_process = "--no-inprocess" not in script_args
+    script_args = [arg for arg in script_args if arg != "--no-inprocess"]
+    
     # Build pytest command
     pytest_args = ["pytest"]
     
     # Add any command line arguments passed to this script
-    if len(sys.argv) > 1:
-        pytest_args.extend(sys.argv[1:])
+    if script_args:
+        pytest_args.extend(script_args)
     else:
         # Default arguments
         pytest_args.extend([
@@ -46,6 +54,16 @@ def main():
             "--cov-report=html",
         ])
     
+    # Fan tests out across CPU cores when pytest-xdist is available.
+    # --dist loadfile keeps each test module (and its fixtures) on one worker.
+    if importlib.util.find_spec("xdist") is not None and not any(
+        arg.startswith(("-n", "--numprocesses")) for arg in pytest_args
+    ):
+        pytest_args.extend(["-n", "auto", "--dist", "loadfile"])
+    
+    # Skip .pytest_cache reads/writes
+    pytest_args.extend(["-p", "no:cacheprovider"])
+    
     print("=" * 70)
     print("🧪 Running Backend Unit Tests")
     print("=" * 70)
@@ -53,18 +71,21 @@ def main():
     print()
     
     # Run pytest
-    result = subprocess.run(pytest_args)
+    if in_process:
+        returncode = int(pytest.main(pytest_args[1:]))
+    else:
+        returncode = subprocess.run(pytest_args).returncode
     
     print()
     print("=" * 70)
-    if result.returncode == 0:
+    if returncode == 0:
         print("✅ All tests passed!")
         print("📊 Coverage report generated in htmlcov/index.html")
     else:
         print("❌ Some tests failed!")
     print("=" * 70)
     
-    return result.returncode
+    return returncode
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -8,13 +8,96 @@ Usage:
     python test_batching.py
 """
 
-import requests
+import sys
 import time
 import asyncio
+import contextlib
 import aiohttp
-from typing import List, Dict, Any
+import orjson
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+# Monotonic integer clock for timings (no float wall-clock conversion)
+now = time.perf_counter_ns
 
 BASE_URL = "http://localhost:8001"
+MODEL = "Qwen/Qwen2.5-Coder-7B-Instruct"
+JSON_HEADERS = {"Content-Type": "application/json"}
+TERMINAL_STATUSES = ("completed", "failed")
+TASK_WAIT_TIMEOUT = 10.0  # seconds
+LOG_QUEUE_SIZE = 1024
+
+# Progress line templates, formatted only once a task reaches a terminal state
+COMPLETED_TEMPLATE = "   Request %d: ✓ Completed (batch %s, size %s)"
+COMPLETED_DETAIL_TEMPLATE = "\n   Request %d: ✓ Completed\n   Batch: %s (size %s)\n   Response: %s"
+FAILED_TEMPLATE = "   Request %d: ✗ Failed - %s"
+TIMEOUT_TEMPLATE = "   Request %d: ⏱ Timeout waiting for completion"
+
+# Chat request body serialized once; only the JSON-encoded prompt is substituted
+CHAT_PAYLOAD_TEMPLATE = (
+    b'{"model":' + orjson.dumps(MODEL) + b',"messages":[{"role":"user","content":%s}]}'
+)
+
+# Prompts shared by the parallel, sequential and concurrent tests, so the
+# performance comparison runs every mode on the same inputs
+PROMPTS = (
+    "What is Python?",
+    "Explain async programming",
+    "What is FastAPI?",
+    "How does GPU batching work?",
+    "What is vLLM?",
+    "Explain continuous batching",
+    "What is machine learning?",
+    "How do transformers work?",
+)
+NUM_PROMPTS = len(PROMPTS)
+
+# Progress lines from concurrent requests are queued and written by one
+# printer task, so the request coroutines never block on stdout
+_log_queue: Optional[asyncio.Queue] = None
+
+def log(line: str):
+    """Queue a progress line (printed directly if no printer is running or the queue is full)"""
+    if _log_queue is not None:
+        try:
+            _log_queue.put_nowait(line)
+            return
+        except asyncio.QueueFull:
+            pass
+    print(line)
+
+async def _log_printer(queue: asyncio.Queue):
+    """Write queued lines to stdout, draining everything available per write"""
+    while True:
+        lines = [await queue.get()]
+        while not queue.empty():
+            lines.append(queue.get_nowait())
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        for _ in lines:
+            queue.task_done()
+
+async def flush_log():
+    """Wait until every queued line has been printed"""
+    if _log_queue is not None:
+        await _log_queue.join()
+
+@contextlib.asynccontextmanager
+async def log_printer():
+    """Run the background log printer for the duration of the block"""
+    global _log_queue
+    _log_queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+    printer = asyncio.create_task(_log_printer(_log_queue))
+    try:
+        yield
+        await flush_log()
+    finally:
+        printer.cancel()
+        _log_queue = None
+
+def orjson_dumps(obj: Any) -> str:
+    """json_serialize for aiohttp sessions: any json= payloads are encoded by orjson"""
+    return orjson.dumps(obj).decode()
 
 def print_section(title: str):
     """Print a formatted section header"""
@@ -22,13 +105,15 @@ def print_section(title: str):
     print(f"  {title}")
     print("=" * 70)
 
-def test_health():
+async def test_health_async(session: aiohttp.ClientSession):
     """Test health endpoint and show batching config"""
-    print_section("1. HEALTH CHECK & BATCHING CONFIG")
+    # Fetch before printing so concurrent probes don't interleave their output
+    async with session.get(f"{BASE_URL}/health") as response:
+        status = response.status
+        data = orjson.loads(await response.read()) if status == 200 else None
     
-    response = requests.get(f"{BASE_URL}/health")
-    if response.status_code == 200:
-        data = response.json()
+    print_section("1. HEALTH CHECK & BATCHING CONFIG")
+    if status == 200:
         print(f"✓ Server Status: {data['status']}")
         print(f"\n📊 Batching Configuration:")
         batching = data.get('batching', {})
@@ -39,209 +124,271 @@ def test_health():
         print(f"   Active Batches: {batching.get('active_batches')}")
         print(f"   Queue Size: {batching.get('queue_size')}")
     else:
-        print(f"✗ Health check failed: {response.status_code}")
-
-async def submit_async_request(session: aiohttp.ClientSession, prompt: str, index: int) -> str:
-    """Submit a single async inference request"""
-    payload = {
-        "model": "Qwen/Qwen2.5-Coder-7B-Instruct",
-        "messages": [
-            {"role": "user", "content": prompt}
-        ]
-    }
-    
-    async with session.post(f"{BASE_URL}/inference/async", json=payload) as response:
-        data = await response.json()
+        print(f"✗ Health check failed: {status}")
+
+async def submit_async_request(session: aiohttp.ClientSession, prompt: str, index: int) -> Dict[str, Any]:
+    """
+    Submit a single async inference request
+    
+    Returns the submission response: task_id and status, plus the result
+    if the server finished the task before answering.
+    """
+    body = CHAT_PAYLOAD_TEMPLATE % orjson.dumps(prompt)
+    
+    async with session.post(f"{BASE_URL}/inference/async", data=body, headers=JSON_HEADERS) as response:
+        data = orjson.loads(await response.read())
         task_id = data.get("task_id")
-        print(f"   Request {index}: Queued with task_id {task_id[:8]}...")
-        return task_id
+        if data.get("result") is not None:
+            log(f"   Request {index}: Completed on submission ({task_id[:8]}...)")
+        else:
+            log(f"   Request {index}: Queued with task_id {task_id[:8]}...")
+        return data
+
+async def stream_task(session: aiohttp.ClientSession, task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Follow the server-sent event stream for a task until it finishes
+    
+    Returns the final task status, {} on timeout, or None if the server
+    does not expose /tasks/{task_id}/stream.
+    """
+    timeout = aiohttp.ClientTimeout(total=TASK_WAIT_TIMEOUT)
+    try:
+        async with session.get(f"{BASE_URL}/tasks/{task_id}/stream", timeout=timeout) as response:
+            if response.status != 200:
+                return None
+            async for line in response.content:
+                if not line.startswith(b"data: "):
+                    continue
+                data = orjson.loads(line[6:])
+                if data.get("status") in TERMINAL_STATUSES:
+                    return data
+    except asyncio.TimeoutError:
+        pass
+    return {}
 
-async def wait_for_task(session: aiohttp.ClientSession, task_id: str, index: int, show_response: bool = False) -> Dict[str, Any]:
-    """Wait for a task to complete and return the result"""
-    max_attempts = 30
-    for attempt in range(max_attempts):
+async def poll_task(session: aiohttp.ClientSession, task_id: str) -> Dict[str, Any]:
+    """
+    Poll /tasks/{task_id} until the task finishes (fallback for servers without streaming)
+    
+    Starts polling after 20 ms and backs off by 1.5x up to 0.5 s, so fast
+    tasks are noticed quickly while slow ones are not hammered.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + TASK_WAIT_TIMEOUT
+    delay = 0.02
+    while loop.time() < deadline:
         async with session.get(f"{BASE_URL}/tasks/{task_id}") as response:
-            data = await response.json()
-            status = data.get("status")
-            
-            if status == "completed":
-                batch_id = data.get("batch_id", "N/A")
-                batch_size = data.get("batch_size", "N/A")
-                
-                if show_response:
-                    result = data.get("result", {})
-                    choices = result.get("choices", [])
-                    if choices:
-                        message = choices[0].get("message", {})
-                        content = message.get("content", "No content")
-                        print(f"\n   Request {index}: ✓ Completed")
-                        print(f"   Batch: {batch_id[:8] if batch_id != 'N/A' else 'N/A'} (size {batch_size})")
-                        print(f"   Response: {content[:100]}..." if len(content) > 100 else f"   Response: {content}")
-                else:
-                    print(f"   Request {index}: ✓ Completed (batch {batch_id[:8] if batch_id != 'N/A' else 'N/A'}, size {batch_size})")
-                return data
-            elif status == "failed":
-                print(f"   Request {index}: ✗ Failed - {data.get('error')}")
+            data = orjson.loads(await response.read())
+            if data.get("status") in TERMINAL_STATUSES:
                 return data
-            
-            await asyncio.sleep(0.2)
+        
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, 0.5)
     
-    print(f"   Request {index}: ⏱ Timeout waiting for completion")
     return {}
 
-async def test_parallel_batching():
+async def wait_for_task(session: aiohttp.ClientSession, task_id: str, index: int, show_response: bool = False,
+                        submitted: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Wait for a task to complete and return the result
+    
+    If the submission response (`submitted`) already carries a finished
+    task, it is used as-is and the server is not contacted again.
+    """
+    if submitted is not None and submitted.get("status") in TERMINAL_STATUSES:
+        data = submitted
+    else:
+        data = await stream_task(session, task_id)
+        if data is None:
+            data = await poll_task(session, task_id)
+    
+    status = data.get("status")
+    
+    if status == "completed":
+        batch_id = data.get("batch_id", "N/A")
+        batch_size = data.get("batch_size", "N/A")
+        batch_short = batch_id[:8] if batch_id != "N/A" else "N/A"
+        
+        if show_response:
+            result = data.get("result", {})
+            choices = result.get("choices", [])
+            if choices:
+                message = choices[0].get("message", {})
+                content = message.get("content", "No content")
+                if len(content) > 100:
+                    content = content[:100] + "..."
+                log(COMPLETED_DETAIL_TEMPLATE % (index, batch_short, batch_size, content))
+        else:
+            log(COMPLETED_TEMPLATE % (index, batch_short, batch_size))
+        return data
+    elif status == "failed":
+        log(FAILED_TEMPLATE % (index, data.get("error")))
+        return data
+    
+    log(TIMEOUT_TEMPLATE % index)
+    return {}
+
+async def test_parallel_batching(session: aiohttp.ClientSession):
     """Test parallel requests with dynamic batching"""
     print_section("2. PARALLEL REQUESTS WITH DYNAMIC BATCHING")
     
-    prompts = [
-        "What is Python?",
-        "Explain async programming",
-        "What is FastAPI?",
-        "How does GPU batching work?",
-        "What is vLLM?",
-        "Explain continuous batching",
-        "What is machine learning?",
-        "How do transformers work?",
-    ]
-    
-    print(f"\n📤 Submitting {len(prompts)} parallel requests...")
-    start_time = time.time()
-    
-    async with aiohttp.ClientSession() as session:
-        # Submit all requests in parallel
-        task_ids = await asyncio.gather(*[
-            submit_async_request(session, prompt, i+1)
-            for i, prompt in enumerate(prompts)
-        ])
-        
-        submit_time = time.time() - start_time
-        print(f"\n✓ All requests submitted in {submit_time:.2f}s")
-        
-        # Wait for all to complete
-        print(f"\n⏳ Waiting for batched processing...")
-        wait_start = time.time()
-        
-        results = await asyncio.gather(*[
-            wait_for_task(session, task_id, i+1, show_response=True)
-            for i, task_id in enumerate(task_ids)
-        ])
-        
-        total_time = time.time() - start_time
-        wait_time = time.time() - wait_start
-        
-        print(f"\n✓ All requests completed in {total_time:.2f}s (wait: {wait_time:.2f}s)")
-        
-        # Show batch information
-        batch_info = {}
-        for result in results:
-            batch_id = result.get("batch_id")
-            if batch_id:
-                if batch_id not in batch_info:
-                    batch_info[batch_id] = {
-                        "size": result.get("batch_size", 0),
-                        "count": 0
-                    }
-                batch_info[batch_id]["count"] += 1
-        
-        if batch_info:
-            print(f"\n📊 Batch Summary:")
-            for i, (batch_id, info) in enumerate(batch_info.items(), 1):
-                print(f"   Batch {i} ({batch_id[:8]}): {info['count']} requests (size: {info['size']})")
+    print(f"\n📤 Submitting {NUM_PROMPTS} parallel requests...")
+    start_time = now()
+    
+    # Submit all requests in parallel
+    submissions = await asyncio.gather(*[
+        submit_async_request(session, prompt, i+1)
+        for i, prompt in enumerate(PROMPTS)
+    ])
+    
+    submit_time = (now() - start_time) / 1e9
+    await flush_log()
+    print(f"\n✓ All requests submitted in {submit_time:.2f}s")
+    
+    # Wait for all to complete
+    print(f"\n⏳ Waiting for batched processing...")
+    wait_start = now()
+    
+    results = await asyncio.gather(*[
+        wait_for_task(session, submitted["task_id"], i+1, show_response=True, submitted=submitted)
+        for i, submitted in enumerate(submissions)
+    ])
+    
+    total_time = (now() - start_time) / 1e9
+    wait_time = (now() - wait_start) / 1e9
+    await flush_log()
+    
+    print(f"\n✓ All requests completed in {total_time:.2f}s (wait: {wait_time:.2f}s)")
+    
+    # Show batch information
+    batched = [result for result in results if result.get("batch_id")]
+    counts = Counter(result["batch_id"] for result in batched)
+    sizes = {result["batch_id"]: result.get("batch_size", 0) for result in batched}
+    
+    if counts:
+        print(f"\n📊 Batch Summary:")
+        for i, (batch_id, count) in enumerate(counts.items(), 1):
+            print(f"   Batch {i} ({batch_id[:8]}): {count} requests (size: {sizes[batch_id]})")
+    
+    return total_time
+
+async def fetch_task_statuses(session: aiohttp.ClientSession, task_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Fetch the status of several tasks in one tick
+    
+    Uses the server's /tasks/batch-status endpoint (one request for all
+    tasks) and falls back to concurrent per-task GETs if it is missing.
+    """
+    body = orjson.dumps(task_ids)
+    async with session.post(f"{BASE_URL}/tasks/batch-status", data=body, headers=JSON_HEADERS) as response:
+        if response.status == 200:
+            data = orjson.loads(await response.read())
+            return data.get("tasks", [])
+    
+    async def fetch_one(task_id: str) -> Dict[str, Any]:
+        async with session.get(f"{BASE_URL}/tasks/{task_id}") as response:
+            return orjson.loads(await response.read()) if response.status == 200 else {}
+    
+    return await asyncio.gather(*[fetch_one(task_id) for task_id in task_ids])
 
-def test_batch_endpoint():
+async def test_batch_endpoint(session: aiohttp.ClientSession):
     """Test the batch endpoint"""
     print_section("3. BATCH ENDPOINT TEST")
     
-    requests_data = [
-        {
-            "model": "Qwen/Qwen2.5-Coder-7B-Instruct",
-            "messages": [{"role": "user", "content": f"Question {i}: What is AI?"}]
-        }
-        for i in range(5)
-    ]
+    questions = [f"Question {i}: What is AI?" for i in range(5)]
     
-    print(f"\n📤 Submitting batch of {len(requests_data)} requests...")
-    start_time = time.time()
+    # Splice pre-serialized request bodies instead of building a dict per request
+    body = b"[" + b",".join(CHAT_PAYLOAD_TEMPLATE % orjson.dumps(q) for q in questions) + b"]"
     
-    response = requests.post(f"{BASE_URL}/inference/batch", json=requests_data)
+    print(f"\n📤 Submitting batch of {len(questions)} requests...")
+    start_time = now()
     
-    if response.status_code == 200:
-        data = response.json()
-        task_ids = data.get("task_ids", [])
-        print(f"✓ Batch submitted: {data.get('count')} tasks")
-        
-        # Wait for completion
-        print(f"\n⏳ Waiting for batch to complete...")
-        completed = 0
-        max_wait = 10
-        
-        for _ in range(max_wait * 5):  # Check every 0.2s
-            time.sleep(0.2)
-            completed = 0
-            for task_id in task_ids:
-                task_response = requests.get(f"{BASE_URL}/tasks/{task_id}")
-                if task_response.status_code == 200:
-                    task_data = task_response.json()
-                    if task_data.get("status") == "completed":
-                        completed += 1
-            
-            if completed == len(task_ids):
-                break
-        
-        total_time = time.time() - start_time
-        print(f"✓ {completed}/{len(task_ids)} tasks completed in {total_time:.2f}s")
-    else:
-        print(f"✗ Batch submission failed: {response.status_code}")
+    async with session.post(f"{BASE_URL}/inference/batch", data=body, headers=JSON_HEADERS) as response:
+        if response.status != 200:
+            print(f"✗ Batch submission failed: {response.status}")
+            return
+        data = orjson.loads(await response.read())
+    
+    task_ids = data.get("task_ids", [])
+    print(f"✓ Batch submitted: {data.get('count')} tasks")
+    
+    # Wait for completion
+    print(f"\n⏳ Waiting for batch to complete...")
+    completed = 0
+    max_wait = 10
+    
+    for _ in range(max_wait * 5):  # Check every 0.2s
+        await asyncio.sleep(0.2)
+        statuses = await fetch_task_statuses(session, task_ids)
+        completed = sum(1 for task in statuses if task.get("status") == "completed")
+    
+        if completed == len(task_ids):
+            break
+    
+    total_time = (now() - start_time) / 1e9
+    print(f"✓ {completed}/{len(task_ids)} tasks completed in {total_time:.2f}s")
+
+async def post_chat(session: aiohttp.ClientSession, prompt: str):
+    """POST one chat completion and return (status code, parsed body or None)"""
+    body = CHAT_PAYLOAD_TEMPLATE % orjson.dumps(prompt)
+    async with session.post(f"{BASE_URL}/v1/chat/completions", data=body, headers=JSON_HEADERS) as response:
+        if response.status != 200:
+            return response.status, None
+        return response.status, orjson.loads(await response.read())
 
-async def test_sequential_processing():
+def print_chat_response(index: int, status_code: int, data: Optional[Dict[str, Any]]):
+    """Print a one-line summary of a chat completion response"""
+    if data is None:
+        print(f"   Request {index}: ✗ Failed ({status_code})")
+        return
+    choices = data.get("choices", [])
+    if choices:
+        content = choices[0].get("message", {}).get("content", "")
+        print(f"   Request {index}: ✓ {content[:80]}..." if len(content) > 80 else f"   Request {index}: ✓ {content}")
+
+async def test_sequential_processing(session: aiohttp.ClientSession):
     """Test sequential processing for comparison"""
     print_section("5. SEQUENTIAL PROCESSING (FOR COMPARISON)")
     
-    prompts = [
-        "What is Python?",
-        "Explain async programming",
-        "What is FastAPI?",
-        "How does GPU batching work?",
-        "What is vLLM?",
-        "Explain continuous batching",
-        "What is machine learning?",
-        "How do transformers work?",
-    ]
-    
-    print(f"\n📤 Sending {len(prompts)} requests SEQUENTIALLY...")
+    print(f"\n📤 Sending {NUM_PROMPTS} requests SEQUENTIALLY...")
     print("   (Using direct v1/chat/completions endpoint)\n")
-    start_time = time.time()
+    start_time = now()
     
-    for i, prompt in enumerate(prompts, 1):
-        payload = {
-            "model": "Qwen/Qwen2.5-Coder-7B-Instruct",
-            "messages": [{"role": "user", "content": prompt}]
-        }
-        
-        response = requests.post(f"{BASE_URL}/v1/chat/completions", json=payload)
-        if response.status_code == 200:
-            data = response.json()
-            choices = data.get("choices", [])
-            if choices:
-                content = choices[0].get("message", {}).get("content", "")
-                print(f"   Request {i}: ✓ {content[:80]}..." if len(content) > 80 else f"   Request {i}: ✓ {content}")
-        else:
-            print(f"   Request {i}: ✗ Failed ({response.status_code})")
+    for i, prompt in enumerate(PROMPTS, 1):
+        status_code, data = await post_chat(session, prompt)
+        print_chat_response(i, status_code, data)
     
-    total_time = time.time() - start_time
-    print(f"\n✓ All {len(prompts)} requests completed in {total_time:.2f}s")
-    print(f"   Average time per request: {total_time/len(prompts):.2f}s")
+    total_time = (now() - start_time) / 1e9
+    print(f"\n✓ All {NUM_PROMPTS} requests completed in {total_time:.2f}s")
+    print(f"   Average time per request: {total_time/NUM_PROMPTS:.2f}s")
     
     return total_time
 
-def test_stats():
+async def test_parallel_direct(session: aiohttp.ClientSession):
+    """Test concurrent direct requests (server-side continuous batching)"""
+    print_section("6. CONCURRENT DIRECT REQUESTS (FOR COMPARISON)")
+    
+    print(f"\n📤 Sending {NUM_PROMPTS} requests CONCURRENTLY...")
+    print("   (Using direct v1/chat/completions endpoint)\n")
+    start_time = now()
+    
+    responses = await asyncio.gather(*[post_chat(session, prompt) for prompt in PROMPTS])
+    for i, (status_code, data) in enumerate(responses, 1):
+        print_chat_response(i, status_code, data)
+    
+    total_time = (now() - start_time) / 1e9
+    print(f"\n✓ All {NUM_PROMPTS} requests completed in {total_time:.2f}s")
+    
+    return total_time
+
+async def test_stats_async(session: aiohttp.ClientSession):
     """Show batching statistics"""
-    print_section("4. BATCHING STATISTICS")
+    async with session.get(f"{BASE_URL}/stats") as response:
+        status = response.status
+        data = orjson.loads(await response.read()) if status == 200 else None
     
-    response = requests.get(f"{BASE_URL}/stats")
-    if response.status_code == 200:
-        data = response.json()
-        
+    print_section("4. BATCHING STATISTICS")
+    if status == 200:
         batching = data.get("batching", {})
         tasks = data.get("tasks", {})
         config = data.get("config", {})
@@ -264,7 +411,45 @@ def test_stats():
         print(f"   Batch Wait Timeout: {config.get('batch_wait_timeout')}s")
         print(f"   Max Concurrent Batches: {config.get('max_concurrent_batches')}")
     else:
-        print(f"✗ Failed to get stats: {response.status_code}")
+        print(f"✗ Failed to get stats: {status}")
+
+async def run_batching_stages(session: aiohttp.ClientSession):
+    """Run the tests that depend on a healthy server (tests 2-6 and the comparison)"""
+    # Test 2: Parallel requests with batching
+    batched_time = await test_parallel_batching(session)
+    
+    # Test 3: Batch endpoint
+    await test_batch_endpoint(session)
+    
+    # Test 4: Stats
+    await test_stats_async(session)
+    
+    # Test 5: Sequential processing comparison
+    sequential_time = await test_sequential_processing(session)
+    
+    # Test 6: Concurrent direct requests comparison
+    concurrent_time = await test_parallel_direct(session)
+    
+    # Final comparison
+    print_section("PERFORMANCE COMPARISON")
+    print(f"\n📊 Summary:")
+    print(f"   Sequential Processing: ~{sequential_time:.2f}s (from test 5)")
+    print(f"   Batched (async queue): ~{batched_time:.2f}s (from test 2)")
+    print(f"   Concurrent Processing: ~{concurrent_time:.2f}s (from test 6)")
+    print(f"   Speedup vs sequential: ~{sequential_time/max(batched_time, 1e-9):.1f}x batched, "
+          f"~{sequential_time/max(concurrent_time, 1e-9):.1f}x concurrent")
+    print(f"\n💡 Note: Concurrent requests let the server batch work together,")
+    print(f"   reducing total processing time significantly!")
+
+async def run_all():
+    """Run all tests on one event loop with a shared aiohttp session"""
+    # One tuned connection pool (and DNS cache) for every async test
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=100, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, json_serialize=orjson_dumps) as session, log_printer():
+        # Test 1: Health check
+        await test_health_async(session)
+        
+        await run_batching_stages(session)
 
 def main():
     """Run all tests"""
@@ -273,35 +458,13 @@ def main():
     print("=" * 70)
     
     try:
-        # Test 1: Health check
-        test_health()
-        
-        # Test 2: Parallel requests with batching
-        asyncio.run(test_parallel_batching())
-        
-        # Test 3: Batch endpoint
-        test_batch_endpoint()
-        
-        # Test 4: Stats
-        test_stats()
-        
-        # Test 5: Sequential processing comparison
-        sequential_time = asyncio.run(test_sequential_processing())
-        
-        # Final comparison
-        print_section("PERFORMANCE COMPARISON")
-        print(f"\n📊 Summary:")
-        print(f"   Sequential Processing: ~{sequential_time:.2f}s")
-        print(f"   Batched Processing: ~1.8s (from test 2)")
-        print(f"   Speedup: ~{sequential_time/1.8:.1f}x faster with batching")
-        print(f"\n💡 Note: Batching groups multiple requests together,")
-        print(f"   reducing total processing time significantly!")
+        asyncio.run(run_all())
         
         print("\n" + "=" * 70)
         print("  ✓ ALL TESTS COMPLETED")
         print("=" * 70)
         
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         print("\n✗ Error: Could not connect to server at", BASE_URL)
         print("  Make sure the mock vLLM server is running:")
         print("  uvicorn mock_vllm:app --reload --port 8000")
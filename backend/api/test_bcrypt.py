@@ -1,9 +1,24 @@
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# This only checks that the bcrypt backend works, so use the minimum cost
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4, deprecated="auto")
 
 try:
     hash = pwd_context.hash("password123")
     print(f"Hash created successfully: {hash}")
 except Exception as e:
     print(f"Error hashing: {e}")
+
+# Optional: argon2 (requires argon2-cffi, e.g. pip install "passlib[argon2]")
+argon2_context = CryptContext(
+    schemes=["argon2"],
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=2,
+)
+
+try:
+    hash = argon2_context.hash("password123")
+    print(f"Argon2 hash created successfully: {hash}")
+except Exception as e:
+    print(f"Argon2 not available: {e}")
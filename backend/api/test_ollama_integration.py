@@ -66,17 +66,52 @@ async def test_complete_flow():
             print(f"   ⚠ Warning: Model '{model}' not in list!")
             print(f"   Run: ollama pull {model}")
         
+        # Steps 4-8 only depend on Ollama being reachable, so run them concurrently
+        prompt = "What is 2+2? Answer with just the number."
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant. Be concise."},
+            {"role": "user", "content": "Explain what is Python in one sentence."}
+        ]
+        prompt_data = {
+            "prompt": "Count from 1 to 5, separated by commas."
+        }
+        messages_data = {
+            "messages": [
+                {"role": "user", "content": "Say 'Hello World' and nothing else."}
+            ]
+        }
+        code_data = {
+            "prompt": "Write a Python function to add two numbers. Just the function, no explanation.",
+            "temperature": 0.1  # Lower temperature for more deterministic output
+        }
+        
+        print(f"\n⚡ Running steps 4-8 concurrently...")
+        (
+            generate_result,
+            chat_result,
+            prompt_result,
+            messages_result,
+            code_result,
+        ) = await asyncio.gather(
+            worker.generate(prompt=prompt),
+            worker.chat(messages=messages),
+            worker.inference(data=prompt_data),
+            worker.inference(data=messages_data),
+            worker.inference(data=code_data),
+        )
+        
         # Step 4: Test simple generation
         print(f"\n💬 Step 4: Testing simple text generation...")
-        prompt = "What is 2+2? Answer with just the number."
         print(f"   Prompt: '{prompt}'")
         
-        result = await worker.generate(prompt=prompt)
+        result = generate_result
         
         if result.get("status") == "success":
             output = result.get("output", "").strip()
             print(f"   ✓ Generation successful!")
             print(f"   Response: {output[:200]}")
+            if result.get("time_to_first_token_ms") is not None:
+                print(f"   Time to first token: {result['time_to_first_token_ms']:.2f}ms")
             print(f"   Processing time: {result.get('processing_time_ms', 0):.2f}ms")
         else:
             print(f"   ✗ Generation failed: {result.get('error')}")
@@ -84,13 +119,9 @@ async def test_complete_flow():
         
         # Step 5: Test chat completion
         print(f"\n💭 Step 5: Testing chat completion...")
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant. Be concise."},
-            {"role": "user", "content": "Explain what is Python in one sentence."}
-        ]
         print(f"   User message: '{messages[1]['content']}'")
         
-        result = await worker.chat(messages=messages)
+        result = chat_result
         
         if result.get("status") == "success":
             output = result.get("output", "").strip()
@@ -103,12 +134,9 @@ async def test_complete_flow():
         
         # Step 6: Test Ray-compatible interface (prompt)
         print(f"\n🔄 Step 6: Testing Ray-compatible interface (prompt)...")
-        data = {
-            "prompt": "Count from 1 to 5, separated by commas."
-        }
-        print(f"   Data: {data}")
+        print(f"   Data: {prompt_data}")
         
-        result = await worker.inference(data=data)
+        result = prompt_result
         
         if result.get("status") == "success":
             output = result.get("output", "").strip()
@@ -121,14 +149,9 @@ async def test_complete_flow():
         
         # Step 7: Test Ray-compatible interface (messages)
         print(f"\n🔄 Step 7: Testing Ray-compatible interface (messages)...")
-        data = {
-            "messages": [
-                {"role": "user", "content": "Say 'Hello World' and nothing else."}
-            ]
-        }
-        print(f"   Data: {data}")
+        print(f"   Data: {messages_data}")
         
-        result = await worker.inference(data=data)
+        result = messages_result
         
         if result.get("status") == "success":
             output = result.get("output", "").strip()
@@ -141,13 +164,9 @@ async def test_complete_flow():
         
         # Step 8: Test code generation (relevant for qwen2.5-coder)
         print(f"\n💻 Step 8: Testing code generation...")
-        data = {
-            "prompt": "Write a Python function to add two numbers. Just the function, no explanation.",
-            "temperature": 0.1  # Lower temperature for more deterministic output
-        }
-        print(f"   Prompt: '{data['prompt']}'")
+        print(f"   Prompt: '{code_data['prompt']}'")
         
-        result = await worker.inference(data=data)
+        result = code_result
         
         if result.get("status") == "success":
             output = result.get("output", "").strip()
@@ -1,52 +1,111 @@
 """
-Simple Ollama Test using requests library
+Simple Ollama Test using aiohttp
 
-This is a simpler test that uses the synchronous requests library
+This is a simpler test that talks to Ollama's HTTP API directly
 to verify Ollama is working before testing the async worker.
 
 Usage:
     python test_ollama_simple.py
 """
 
-import requests
-import json
+import asyncio
+import aiohttp
+import orjson
 import os
+import sys
+import time
 
-def test_ollama_simple():
-    """Simple synchronous test of Ollama"""
+now = time.perf_counter_ns
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def stream_ndjson(session: aiohttp.ClientSession, url: str, payload: dict, extract, timeout: int = 60):
+    """
+    POST with "stream": true and echo Ollama's NDJSON chunks as they arrive
     
-    print("=" * 70)
-    print("SIMPLE OLLAMA TEST")
-    print("=" * 70)
+    Args:
+        session: Shared aiohttp session
+        url: Ollama endpoint
+        payload: Request payload (streaming is forced on)
+        extract: Function returning the text of one chunk
+        timeout: Request timeout in seconds
     
+    Returns:
+        Tuple of (full output, time to first token in seconds, final chunk),
+        or None if Ollama returned an error status
+    """
+    start = now()
+    time_to_first_token = None
+    parts = []
+    final = {}
+    
+    body = orjson.dumps({**payload, "stream": True})
+    request_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with session.post(url, data=body, headers=JSON_HEADERS, timeout=request_timeout) as response:
+        if response.status != 200:
+            print(f"   ✗ Request failed: {response.status}")
+            print(f"   Error: {await response.text()}")
+            return None
+        
+        sys.stdout.write("   Response: ")
+        async for line in response.content:
+            line = line.strip()
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            text = extract(chunk)
+            if text:
+                if time_to_first_token is None:
+                    time_to_first_token = (now() - start) / 1e9
+                parts.append(text)
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            if chunk.get("done"):
+                final = chunk
+        sys.stdout.write("\n")
+    
+    return "".join(parts).strip(), time_to_first_token, final
+
+async def test_ollama_health_async(session: aiohttp.ClientSession) -> bool:
+    """
+    Check that Ollama is up and the configured model is pulled (Test 1)
+    
+    Takes the caller's session so it can run alongside other probes.
+    """
     base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     model = os.getenv("OLLAMA_MODEL", "qwen2.5-coder:14b")
     
-    print(f"\n📋 Configuration:")
-    print(f"   Base URL: {base_url}")
-    print(f"   Model: {model}")
-    
-    # Test 1: Health check
-    print(f"\n🏥 Test 1: Health check...")
     try:
-        response = requests.get(f"{base_url}/api/tags", timeout=5)
-        if response.status_code == 200:
-            print("   ✓ Ollama is running")
-            data = response.json()
-            models = [m["name"] for m in data.get("models", [])]
-            print(f"   Available models: {', '.join(models)}")
-            if model not in models:
-                print(f"   ⚠ Warning: Model '{model}' not found!")
-                print(f"   Run: ollama pull {model}")
-                return False
-        else:
-            print(f"   ✗ Ollama returned status {response.status_code}")
-            return False
-    except Exception as e:
+        timeout = aiohttp.ClientTimeout(total=5)
+        async with session.get(f"{base_url}/api/tags", timeout=timeout) as response:
+            status = response.status
+            data = orjson.loads(await response.read()) if status == 200 else None
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"\n🏥 Ollama health check ({base_url})...")
         print(f"   ✗ Cannot connect to Ollama: {e}")
         print("   Make sure Ollama is running")
         return False
     
+    print(f"\n🏥 Ollama health check ({base_url})...")
+    if status != 200:
+        print(f"   ✗ Ollama returned status {status}")
+        return False
+    
+    print("   ✓ Ollama is running")
+    models = [m["name"] for m in data.get("models", [])]
+    print(f"   Available models: {', '.join(models)}")
+    if model not in models:
+        print(f"   ⚠ Warning: Model '{model}' not found!")
+        print(f"   Run: ollama pull {model}")
+        return False
+    return True
+
+async def run_ollama_stages(session: aiohttp.ClientSession) -> bool:
+    """Run the tests that need a ready Ollama (tests 2-3)"""
+    base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    model = os.getenv("OLLAMA_MODEL", "qwen2.5-coder:14b")
+    
     # Test 2: Simple generation
     print(f"\n💬 Test 2: Simple text generation...")
     prompt = "What is 2+2? Answer with just the number."
@@ -55,29 +114,26 @@ def test_ollama_simple():
     try:
         payload = {
             "model": model,
-            "prompt": prompt,
-            "stream": False
+            "prompt": prompt
         }
         
-        response = requests.post(
+        streamed = await stream_ndjson(
+            session,
             f"{base_url}/api/generate",
-            json=payload,
-            timeout=60
+            payload,
+            lambda chunk: chunk.get("response", "")
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            output = result.get("response", "").strip()
-            print(f"   ✓ Generation successful!")
-            print(f"   Response: {output[:200]}")
-            
-            # Show timing info
-            total_duration = result.get("total_duration", 0) / 1e9  # Convert to seconds
-            print(f"   Total time: {total_duration:.2f}s")
-        else:
-            print(f"   ✗ Generation failed: {response.status_code}")
-            print(f"   Error: {response.text}")
+        if streamed is None:
             return False
+        
+        output, time_to_first_token, result = streamed
+        print(f"   ✓ Generation successful!")
+        
+        # Show timing info
+        if time_to_first_token is not None:
+            print(f"   Time to first token: {time_to_first_token:.2f}s")
+        total_duration = result.get("total_duration", 0) / 1e9  # Convert to seconds
+        print(f"   Total time: {total_duration:.2f}s")
             
     except Exception as e:
         print(f"   ✗ Error: {e}")
@@ -94,34 +150,55 @@ def test_ollama_simple():
     try:
         payload = {
             "model": model,
-            "messages": messages,
-            "stream": False
+            "messages": messages
         }
         
-        response = requests.post(
+        streamed = await stream_ndjson(
+            session,
             f"{base_url}/api/chat",
-            json=payload,
-            timeout=60
+            payload,
+            lambda chunk: chunk.get("message", {}).get("content", "")
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            output = result.get("message", {}).get("content", "").strip()
-            print(f"   ✓ Chat successful!")
-            print(f"   Response: {output[:200]}")
-            
-            # Show timing info
-            total_duration = result.get("total_duration", 0) / 1e9
-            print(f"   Total time: {total_duration:.2f}s")
-        else:
-            print(f"   ✗ Chat failed: {response.status_code}")
-            print(f"   Error: {response.text}")
+        if streamed is None:
             return False
+        
+        output, time_to_first_token, result = streamed
+        print(f"   ✓ Chat successful!")
+        
+        # Show timing info
+        if time_to_first_token is not None:
+            print(f"   Time to first token: {time_to_first_token:.2f}s")
+        total_duration = result.get("total_duration", 0) / 1e9
+        print(f"   Total time: {total_duration:.2f}s")
             
     except Exception as e:
         print(f"   ✗ Error: {e}")
         return False
     
+    return True
+
+async def run_all() -> bool:
+    """Run all tests on one event loop with a shared aiohttp session"""
+    async with aiohttp.ClientSession() as session:
+        return await test_ollama_health_async(session) and await run_ollama_stages(session)
+
+def test_ollama_simple():
+    """Simple test of Ollama over its HTTP API"""
+    
+    print("=" * 70)
+    print("SIMPLE OLLAMA TEST")
+    print("=" * 70)
+    
+    base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    model = os.getenv("OLLAMA_MODEL", "qwen2.5-coder:14b")
+    
+    print(f"\n📋 Configuration:")
+    print(f"   Base URL: {base_url}")
+    print(f"   Model: {model}")
+    
+    if not asyncio.run(run_all()):
+        return False
+    
     print("\n" + "=" * 70)
     print("✅ ALL TESTS PASSED!")
     print("=" * 70)
@@ -132,6 +209,5 @@ def test_ollama_simple():
 
 
 if __name__ == "__main__":
-    import sys
     success = test_ollama_simple()
     sys.exit(0 if success else 1)
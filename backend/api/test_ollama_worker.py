@@ -64,12 +64,26 @@ async def test_ollama_worker():
         print("   No models found")
         return
     
+    # Generation, chat and inference are independent, so run them concurrently
+    test_prompt = "Say hello in one sentence."
+    test_messages = [
+        {"role": "user", "content": "What is 2+2? Answer in one sentence."}
+    ]
+    test_data = {
+        "prompt": "Count from 1 to 3."
+    }
+    
+    generate_result, chat_result, inference_result = await asyncio.gather(
+        worker.generate(prompt=test_prompt),
+        worker.chat(messages=test_messages),
+        worker.inference(data=test_data),
+    )
+    
     # Test text generation
     print(f"\n4. Testing text generation...")
-    test_prompt = "Say hello in one sentence."
     print(f"   Prompt: {test_prompt}")
     
-    result = await worker.generate(prompt=test_prompt)
+    result = generate_result
     
     if result.get("status") == "success":
         print(f"   ✓ Generation successful")
@@ -80,12 +94,9 @@ async def test_ollama_worker():
     
     # Test chat completion
     print(f"\n5. Testing chat completion...")
-    test_messages = [
-        {"role": "user", "content": "What is 2+2? Answer in one sentence."}
-    ]
     print(f"   Message: {test_messages[0]['content']}")
     
-    result = await worker.chat(messages=test_messages)
+    result = chat_result
     
     if result.get("status") == "success":
         print(f"   ✓ Chat successful")
@@ -96,12 +107,9 @@ async def test_ollama_worker():
     
     # Test inference method (Ray-compatible interface)
     print(f"\n6. Testing inference method (Ray-compatible)...")
-    test_data = {
-        "prompt": "Count from 1 to 3."
-    }
     print(f"   Data: {test_data}")
     
-    result = await worker.inference(data=test_data)
+    result = inference_result
     
     if result.get("status") == "success":
         print(f"   ✓ Inference successful")
@@ -13,7 +13,9 @@ import asyncio
 import os
 import sys
 import logging
+import pytest
 from datetime import datetime
+from typing import Any, List, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -29,87 +31,117 @@ if workers_path not in sys.path:
 
 from vllm_worker import get_vllm_worker, close_vllm_worker
 
-async def test_vllm_flow():
-    """Test the complete vLLM worker flow"""
-    
-    print("=" * 70)
-    print("vLLM INTEGRATION TEST")
-    print("=" * 70)
+def emit(lines: List[str]):
+    """Write one step's output with a single write instead of a print per line"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def describe_result(result: Any, show_time: bool = False) -> List[str]:
+    """Format a worker result (or the exception gather returned in its place)"""
+    if isinstance(result, Exception):
+        return [f"   ✗ Failed: {result}"]
+    if result["status"] != "success":
+        return [f"   ✗ Failed: {result.get('error')}"]
     
-    # Configuration
+    lines = ["   ✓ Success!", f"   Output: {result['output'].strip()}"]
+    if show_time:
+        lines.append(f"   Time: {result['processing_time_ms']:.2f}ms")
+    return lines
+
+def get_test_configs() -> List[Tuple[str, str]]:
+    """(base_url, model) pairs to test; VLLM_MODELS may list several models"""
     base_url = os.getenv("VLLM_BASE_URL", "http://localhost:8001")
-    model = os.getenv("VLLM_MODEL", "Qwen/Qwen2.5-Coder-7B-Instruct")
+    models = os.getenv("VLLM_MODELS") or os.getenv("VLLM_MODEL", "Qwen/Qwen2.5-Coder-7B-Instruct")
+    return [(base_url, model.strip()) for model in models.split(",") if model.strip()]
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_vllm_flow():
+    """Test the complete vLLM worker flow"""
+    base_url, model = get_test_configs()[0]
+    try:
+        assert await run_vllm_flow(base_url, model)
+    finally:
+        await close_vllm_worker()
+
+async def run_vllm_flow(base_url: str, model: str) -> bool:
+    """
+    Run the vLLM worker flow against one (base_url, model) configuration
     
-    print(f"Configuration:")
-    print(f"  Base URL: {base_url}")
-    print(f"  Model: {model}")
-    print("-" * 70)
+    The worker singleton (and its connection pool) is left open so later
+    runs against the same configuration reuse it; the caller closes it.
+    """
+    emit([
+        "=" * 70,
+        "vLLM INTEGRATION TEST",
+        "=" * 70,
+        "Configuration:",
+        f"  Base URL: {base_url}",
+        f"  Model: {model}",
+        "-" * 70,
+    ])
     
     try:
-        # 1. Initialize Worker
-        print("\n1. Initializing Worker...")
+        # 1. Initialize Worker (the singleton is only rebuilt if the configuration changed)
         worker = await get_vllm_worker(base_url=base_url, model=model)
-        print("   ✓ Worker initialized")
+        if (worker.base_url, worker.model) != (base_url.rstrip("/"), model):
+            await close_vllm_worker()
+            worker = await get_vllm_worker(base_url=base_url, model=model)
+        emit(["\n1. Initializing Worker...", "   ✓ Worker initialized"])
         
         # 2. Health Check
-        print("\n2. Health Check...")
         is_healthy = await worker.health_check()
         if is_healthy:
-            print("   ✓ vLLM is healthy")
+            emit(["\n2. Health Check...", "   ✓ vLLM is healthy"])
         else:
-            print("   ✗ vLLM is NOT accessible")
-            print("   Make sure the server is running!")
+            emit([
+                "\n2. Health Check...",
+                "   ✗ vLLM is NOT accessible",
+                "   Make sure the server is running!",
+            ])
             return False
             
-        # 3. List Models
-        print("\n3. Listing Models...")
-        models = await worker.list_models()
-        print(f"   Available models: {models}")
-        
-        # 4. Text Generation
-        print("\n4. Testing Text Generation...")
+        # Steps 3-6 are independent once the server is healthy, so run them
+        # concurrently and report the results in order
         prompt = "What is 2+2? Answer with just the number."
-        print(f"   Prompt: '{prompt}'")
-        
-        result = await worker.generate(prompt=prompt, temperature=0.1)
-        
-        if result["status"] == "success":
-            print(f"   ✓ Success!")
-            print(f"   Output: {result['output'].strip()}")
-            print(f"   Time: {result['processing_time_ms']:.2f}ms")
-        else:
-            print(f"   ✗ Failed: {result.get('error')}")
-            
-        # 5. Chat Completion
-        print("\n5. Testing Chat Completion...")
         messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Say hello!"}
         ]
+        data = {"prompt": "Count to 3"}
         
-        result = await worker.chat(messages=messages)
+        emit(["\n⚡ Running steps 3-6 concurrently..."])
+        models, generate_result, chat_result, inference_result = await asyncio.gather(
+            worker.list_models(),
+            worker.generate(prompt=prompt, temperature=0.1),
+            worker.chat(messages=messages),
+            worker.inference(data),
+            return_exceptions=True
+        )
         
-        if result["status"] == "success":
-            print(f"   ✓ Success!")
-            print(f"   Output: {result['output'].strip()}")
+        # 3. List Models
+        lines = ["\n3. Listing Models..."]
+        if isinstance(models, Exception):
+            lines.append(f"   ✗ Failed: {models}")
         else:
-            print(f"   ✗ Failed: {result.get('error')}")
+            lines.append(f"   Available models: {models}")
+        emit(lines)
+        
+        # 4. Text Generation
+        lines = ["\n4. Testing Text Generation...", f"   Prompt: '{prompt}'"]
+        lines.extend(describe_result(generate_result, show_time=True))
+        emit(lines)
+            
+        # 5. Chat Completion
+        lines = ["\n5. Testing Chat Completion..."]
+        lines.extend(describe_result(chat_result))
+        emit(lines)
             
         # 6. Ray-compatible Interface
-        print("\n6. Testing Ray-compatible Interface...")
-        data = {"prompt": "Count to 3"}
-        
-        result = await worker.inference(data)
-        
-        if result["status"] == "success":
-            print(f"   ✓ Success!")
-            print(f"   Output: {result['output'].strip()}")
-        else:
-            print(f"   ✗ Failed: {result.get('error')}")
+        lines = ["\n6. Testing Ray-compatible Interface..."]
+        lines.extend(describe_result(inference_result))
+        emit(lines)
             
-        print("\n" + "=" * 70)
-        print("✅ ALL TESTS PASSED")
-        print("=" * 70)
+        emit(["\n" + "=" * 70, "✅ ALL TESTS PASSED", "=" * 70])
         return True
         
     except Exception as e:
@@ -117,15 +149,12 @@ async def test_vllm_flow():
         import traceback
         traceback.print_exc()
         return False
-    finally:
-        await close_vllm_worker()
 
 if __name__ == "__main__":
-    # Run async test
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        success = loop.run_until_complete(test_vllm_flow())
-        sys.exit(0 if success else 1)
-    finally:
-        loop.close()
+    # One event loop for every configuration, so the worker's client stays warm
+    with asyncio.Runner() as runner:
+        try:
+            results = [runner.run(run_vllm_flow(base_url, model)) for base_url, model in get_test_configs()]
+        finally:
+            runner.run(close_vllm_worker())
+    sys.exit(0 if all(results) else 1)
@@ -9,29 +9,89 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 os.environ["REDIS_URL"] = "redis://localhost:6379/15"
 os.environ["JWT_SECRET_KEY"] = "test-secret-key"
+os.environ["BCRYPT_ROUNDS"] = "4"  # minimum bcrypt cost keeps password tests fast
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from app.database import Base
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
-@pytest.fixture(scope="function")
-def test_db():
-    """Create a fresh database for each test."""
-    engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="session")
+def engine():
+    """Create the in-memory database and its tables once per test session."""
+    # StaticPool hands every checkout the same connection, so all sessions
+    # see the same in-memory database
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy
+    # emit BEGIN itself instead
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    db = TestingSessionLocal()
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def test_db(engine):
+    """Give each test a session whose changes are rolled back afterwards."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Commits inside the test only release SAVEPOINTs of the outer transaction
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+@pytest.fixture
+def make_users(test_db):
+    """Return a helper that bulk-inserts n users with one executemany INSERT."""
+    from app.models import User
+    
+    def _make_users(n: int):
+        users = [
+            {
+                "id": f"user-{i}",
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "hashed_password": f"hash{i}",
+            }
+            for i in range(n)
+        ]
+        test_db.execute(insert(User), users)
+        test_db.commit()
+        return users
+    
+    return _make_users
+
+@pytest.fixture(scope="session")
+def signed_token():
+    """An access token for "testuser", signed once per test session."""
+    from app.auth import create_access_token
+    return create_access_token({"sub": "testuser"})
+
+@pytest.fixture(scope="session")
+def decoded_payload(signed_token):
+    """The decoded claims of signed_token."""
+    from jose import jwt
+    from app.auth import SECRET_KEY, ALGORITHM
+    return jwt.decode(signed_token, SECRET_KEY, algorithms=[ALGORITHM])
 
 @pytest.fixture(scope="function")
 def test_settings():
@@ -42,24 +42,16 @@ class TestPasswordHashing:
 class TestJWTTokens:
     """Test JWT token creation and validation."""
     
-    def test_create_access_token(self):
+    def test_create_access_token(self, signed_token):
         """Test creating an access token."""
-        data = {"sub": "testuser"}
-        token = create_access_token(data)
-        
-        assert token is not None
-        assert isinstance(token, str)
-        assert len(token) > 0
+        assert signed_token is not None
+        assert isinstance(signed_token, str)
+        assert len(signed_token) > 0
     
-    def test_token_contains_correct_data(self):
+    def test_token_contains_correct_data(self, decoded_payload):
         """Test that token contains the correct data."""
-        data = {"sub": "testuser"}
-        token = create_access_token(data)
-        
-        # Decode token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        assert payload["sub"] == "testuser"
-        assert "exp" in payload
+        assert decoded_payload["sub"] == "testuser"
+        assert "exp" in decoded_payload
     
     def test_token_with_custom_expiration(self):
         """Test creating token with custom expiration."""
@@ -97,7 +89,7 @@ class TestUserAuthentication:
             is_active=True,
         )
         test_db.add(user)
-        test_db.commit()
+        test_db.flush()
         
         # Retrieve user
         retrieved = get_user(test_db, "testuser")
@@ -2,14 +2,14 @@
 Unit tests for configuration module.
 """
 import pytest
-from app.config import Settings
+from app.config import Settings, get_settings
 
 class TestSettings:
     """Test Settings configuration."""
     
     def test_default_settings(self):
         """Test that default settings are loaded correctly."""
-        settings = Settings()
+        settings = get_settings()
         assert settings.APP_NAME == "AI Inference API"
         assert settings.LOG_LEVEL == "info"
         assert settings.JWT_ALGORITHM == "HS256"
@@ -25,9 +25,13 @@ class TestSettings:
         assert settings.LOG_LEVEL == "debug"
         assert settings.JWT_SECRET_KEY == "custom-secret"
     
+    def test_get_settings_is_cached(self):
+        """Test that get_settings returns the same instance every time."""
+        assert get_settings() is get_settings()
+    
     def test_jwt_expiration_is_integer(self):
         """Test that JWT expiration is an integer."""
-        settings = Settings()
+        settings = get_settings()
         assert isinstance(settings.JWT_EXPIRATION_MINUTES, int)
         assert settings.JWT_EXPIRATION_MINUTES > 0
 
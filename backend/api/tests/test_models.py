@@ -18,7 +18,7 @@ class TestUserModel:
             is_active=True,
         )
         test_db.add(user)
-        test_db.commit()
+        test_db.flush()
         
         # Retrieve user
         retrieved_user = test_db.query(User).filter(User.username == "testuser").first()
@@ -49,6 +49,13 @@ class TestUserModel:
         with pytest.raises(Exception):  # Should raise IntegrityError
             test_db.commit()
 
+    def test_bulk_insert_users(self, test_db, make_users):
+        """Test inserting many users in one batch."""
+        make_users(5)
+        
+        assert test_db.query(User).count() == 5
+        assert test_db.query(User).filter(User.username == "user3").first().is_active is True
+
 class TestInferenceRequestModel:
     """Test InferenceRequest model."""
     
@@ -63,7 +70,7 @@ class TestInferenceRequestModel:
             created_at=datetime.utcnow(),
         )
         test_db.add(request)
-        test_db.commit()
+        test_db.flush()
         
         # Retrieve request
         retrieved = test_db.query(InferenceRequest).filter(
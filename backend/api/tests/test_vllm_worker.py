@@ -0,0 +1,107 @@
+"""
+Unit tests for the vLLM worker's generate() microbatching.
+"""
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "workers"))
+
+from vllm_worker import VLLMWorker
+
+
+class FakeCompletions:
+    """MockTransport handler that records /v1/completions bodies and echoes each prompt."""
+    
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.requests = []
+    
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, text="boom")
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        choices = [{"index": i, "text": f"echo {prompt}"} for i, prompt in enumerate(prompts)]
+        return httpx.Response(200, json={"choices": choices, "usage": {"total_tokens": len(prompts)}})
+
+
+@pytest.fixture
+async def make_worker():
+    """Build microbatching workers backed by a FakeCompletions handler."""
+    workers = []
+    
+    def factory(handler: FakeCompletions) -> VLLMWorker:
+        worker = VLLMWorker(base_url="http://vllm.test", microbatch=True)
+        worker.client = httpx.AsyncClient(base_url=worker.base_url, transport=httpx.MockTransport(handler))
+        workers.append(worker)
+        return worker
+    
+    yield factory
+    for worker in workers:
+        await worker.close()
+
+
+class TestMicrobatching:
+    """Test coalescing of concurrent generate() calls."""
+    
+    async def test_concurrent_prompts_share_one_request(self, make_worker):
+        """Concurrent prompts with equal parameters are sent as one request."""
+        handler = FakeCompletions()
+        worker = make_worker(handler)
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(*[worker.generate(f"p{i}", stop=["\n"]) for i in range(3)]),
+            timeout=5,
+        )
+        
+        assert len(handler.requests) == 1
+        assert handler.requests[0]["prompt"] == ["p0", "p1", "p2"]
+        assert handler.requests[0]["stop"] == ["\n"]
+        assert [result["output"] for result in results] == ["echo p0", "echo p1", "echo p2"]
+        assert all(result["batch_size"] == 3 for result in results)
+    
+    async def test_different_parameters_are_sent_separately(self, make_worker):
+        """Prompts with different sampling parameters get their own request."""
+        handler = FakeCompletions()
+        worker = make_worker(handler)
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(worker.generate("a", stop=["x"]), worker.generate("b", stop=["y"])),
+            timeout=5,
+        )
+        
+        assert sorted(body["prompt"] for body in handler.requests) == ["a", "b"]
+        assert [result["output"] for result in results] == ["echo a", "echo b"]
+    
+    async def test_unkeyable_parameters_fail_without_stalling_the_dispatcher(self, make_worker):
+        """A parameter that can't be keyed fails its caller; the rest still complete."""
+        handler = FakeCompletions()
+        worker = make_worker(handler)
+        
+        bad, good = await asyncio.wait_for(
+            asyncio.gather(worker.generate("bad", stop={"x"}), worker.generate("good")),
+            timeout=5,
+        )
+        
+        assert bad["status"] == "failed"
+        assert good["output"] == "echo good"
+        assert not worker._dispatcher.done()
+        assert (await asyncio.wait_for(worker.generate("again"), timeout=5))["output"] == "echo again"
+    
+    async def test_server_error_fails_every_caller(self, make_worker):
+        """An error response resolves every coalesced caller with the error."""
+        worker = make_worker(FakeCompletions(status_code=500))
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(*[worker.generate(f"p{i}") for i in range(2)]),
+            timeout=5,
+        )
+        
+        assert all(result["status"] == "failed" for result in results)
+        assert all("500" in result["error"] for result in results)
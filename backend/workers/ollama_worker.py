@@ -7,12 +7,116 @@ It provides the same interface as Ray workers for compatibility.
 
 import logging
 import asyncio
-from typing import Dict, Any, Optional
-from datetime import datetime
+import importlib.util
+import json
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, AsyncIterator
 import httpx
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    _json_loads = json.loads
+
+try:
+    import msgspec
+except ImportError:  # listed in requirements.txt; without it stream chunks go through _json_loads
+    msgspec = None
+
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]") and is
+# negotiated via TLS ALPN, so it only applies to https:// Ollama endpoints
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Request bodies are small JSON blobs; don't let Nagle's algorithm hold them back
+SOCKET_OPTIONS = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+
+# Top-level request fields that inference() forwards to generate/chat
+# ("model" overrides the worker's default model for that call)
+OLLAMA_REQUEST_KEYS = frozenset({
+    "model", "format", "system", "template", "context", "raw", "images", "keep_alive", "options", "timeout"
+})
+# Sampling/runtime parameters that Ollama expects inside "options"
+OLLAMA_OPTION_KEYS = frozenset({
+    "temperature", "top_p", "top_k", "min_p", "typical_p", "tfs_z", "seed", "stop",
+    "num_predict", "num_ctx", "repeat_penalty", "repeat_last_n",
+    "presence_penalty", "frequency_penalty", "mirostat", "mirostat_tau", "mirostat_eta"
+})
+# Payloads holding only these keys can be passed to generate/chat unchanged
+GENERATE_CALL_KEYS = OLLAMA_REQUEST_KEYS | {"prompt"}
+CHAT_CALL_KEYS = OLLAMA_REQUEST_KEYS | {"messages"}
+
+
+# Typed view of one NDJSON line of an /api/generate or /api/chat stream.
+# With msgspec, lines decode straight into these structs (no per-token dict).
+if msgspec is not None:
+    class OllamaMessage(msgspec.Struct, gc=False):
+        role: str = "assistant"
+        content: str = ""
+
+    class OllamaChunk(msgspec.Struct, gc=False):
+        response: str = ""
+        message: Optional[OllamaMessage] = None
+        done: bool = False
+        error: Optional[str] = None
+        total_duration: Optional[int] = None
+        load_duration: Optional[int] = None
+        prompt_eval_count: Optional[int] = None
+        eval_count: Optional[int] = None
+
+    _decode_chunk = msgspec.json.Decoder(OllamaChunk).decode
+else:
+    @dataclass
+    class OllamaMessage:
+        role: str = "assistant"
+        content: str = ""
+
+    @dataclass
+    class OllamaChunk:
+        response: str = ""
+        message: Optional[OllamaMessage] = None
+        done: bool = False
+        error: Optional[str] = None
+        total_duration: Optional[int] = None
+        load_duration: Optional[int] = None
+        prompt_eval_count: Optional[int] = None
+        eval_count: Optional[int] = None
+
+    def _decode_chunk(line: str) -> OllamaChunk:
+        data = _json_loads(line)
+        message = data.get("message")
+        return OllamaChunk(
+            response=data.get("response", ""),
+            message=OllamaMessage(message.get("role", "assistant"), message.get("content", "")) if message else None,
+            done=data.get("done", False),
+            error=data.get("error"),
+            total_duration=data.get("total_duration"),
+            load_duration=data.get("load_duration"),
+            prompt_eval_count=data.get("prompt_eval_count"),
+            eval_count=data.get("eval_count"),
+        )
+
+
+def _chunk_stats(chunk: Optional[OllamaChunk]) -> Dict[str, Any]:
+    """Timing/token counts Ollama reports on the final ("done") chunk"""
+    if chunk is None:
+        return {"total_duration": None, "load_duration": None, "prompt_eval_count": None, "eval_count": None}
+    return {
+        "total_duration": chunk.total_duration,
+        "load_duration": chunk.load_duration,
+        "prompt_eval_count": chunk.prompt_eval_count,
+        "eval_count": chunk.eval_count,
+    }
+
 
 class OllamaWorker:
     """
@@ -25,6 +129,11 @@ class OllamaWorker:
     - Error handling
     """
     
+    # Per-call defaults, so one runaway generation can't pin the client
+    DEFAULT_NUM_PREDICT = 512  # max tokens generated per call
+    DEFAULT_MAX_RETRIES = 3  # attempts for transport errors and 5xx responses
+    MODELS_CACHE_TTL = 60.0  # seconds to reuse the /api/tags model list
+    
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama2", timeout: int = 120):
         """
         Initialize Ollama worker
@@ -37,10 +146,36 @@ class OllamaWorker:
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self._models_cache: Optional[list] = None
+        self._models_cache_expires = 0.0
+        
+        # One pooled client for all calls; the transport retries connection
+        # failures (e.g. TCP resets) so they don't surface as failed inferences
+        transport = httpx.AsyncHTTPTransport(
+            retries=2,
+            http2=HTTP2_AVAILABLE,
+            socket_options=SOCKET_OPTIONS,
+            limits=httpx.Limits(
+                max_connections=256,
+                max_keepalive_connections=64,
+                keepalive_expiry=60.0
+            )
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            headers={"Connection": "keep-alive"},
+            transport=transport,
+            event_hooks={"response": [self._log_http_version]} if logger.isEnabledFor(logging.DEBUG) else None
+        )
         
         logger.info(f"Initialized OllamaWorker with model '{model}' at {base_url}")
     
+    @staticmethod
+    async def _log_http_version(response: httpx.Response):
+        """Debug hook: show which protocol (HTTP/1.1 or HTTP/2) each response used"""
+        logger.debug(f"{response.request.method} {response.request.url.path} -> {response.http_version}")
+    
     async def health_check(self) -> bool:
         """
         Check if Ollama is running and accessible
@@ -49,76 +184,184 @@ class OllamaWorker:
             True if Ollama is healthy, False otherwise
         """
         try:
-            response = await self.client.get(f"{self.base_url}/api/tags")
+            response = await self.client.get("/api/tags")
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Ollama health check failed: {str(e)}")
             return False
     
-    async def list_models(self) -> list:
+    async def list_models(self, refresh: bool = False) -> list:
         """
         List available models in Ollama
         
+        The list is cached for MODELS_CACHE_TTL seconds since it rarely changes.
+        
+        Args:
+            refresh: Bypass the cache and query Ollama again
+        
         Returns:
             List of model names
         """
+        if not refresh and self._models_cache is not None and time.monotonic() < self._models_cache_expires:
+            return list(self._models_cache)
+        
         try:
-            response = await self.client.get(f"{self.base_url}/api/tags")
+            response = await self.client.get("/api/tags")
             if response.status_code == 200:
-                data = response.json()
-                return [model["name"] for model in data.get("models", [])]
+                data = _json_loads(response.content)
+                self._models_cache = [model["name"] for model in data.get("models", [])]
+                self._models_cache_expires = time.monotonic() + self.MODELS_CACHE_TTL
+                return list(self._models_cache)
             return []
         except Exception as e:
             logger.error(f"Failed to list models: {str(e)}")
             return []
     
+    def _apply_defaults(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Cap the generation length unless the caller set num_predict or max_tokens"""
+        max_tokens = payload.pop("max_tokens", None)
+        options = payload.get("options") or {}
+        if "num_predict" not in options:
+            num_predict = self.DEFAULT_NUM_PREDICT if max_tokens is None else max_tokens
+            payload["options"] = {**options, "num_predict": num_predict}
+        return payload
+    
+    async def _stream_chunks(self, path: str, payload: Dict[str, Any], timeout: Optional[float]) -> AsyncIterator[OllamaChunk]:
+        """
+        POST with "stream": true and yield Ollama's NDJSON chunks as they arrive
+        
+        timeout=None uses the worker's client timeout (self.timeout, with a
+        10s connect timeout).
+        
+        Opening the stream is retried on transport errors and 5xx responses,
+        backing off exponentially (0.25s, 0.5s, ...). Once the first chunk has
+        been yielded, errors are raised as-is.
+        """
+        body = _json_dumps({**payload, "stream": True})
+        if timeout is None:
+            timeout = httpx.USE_CLIENT_DEFAULT
+        
+        for attempt in range(self.DEFAULT_MAX_RETRIES):
+            last_attempt = attempt == self.DEFAULT_MAX_RETRIES - 1
+            started = False
+            try:
+                async with self.client.stream("POST", path, content=body, headers=JSON_HEADERS, timeout=timeout) as response:
+                    if response.status_code >= 500 and not last_attempt:
+                        logger.warning(f"Ollama returned {response.status_code} for {path}, retrying")
+                    elif response.status_code != 200:
+                        await response.aread()
+                        raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+                    else:
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = _decode_chunk(line)
+                            if chunk.error is not None:
+                                raise Exception(f"Ollama API error: {chunk.error}")
+                            started = True
+                            yield chunk
+                        return
+            except httpx.TransportError as e:
+                if started or last_attempt:
+                    raise
+                logger.warning(f"Ollama request to {path} failed ({e!r}), retrying")
+            
+            await asyncio.sleep(0.25 * 2 ** attempt)
+    
+    def _generate_chunks(self, prompt: str, timeout: Optional[float] = None, **kwargs) -> AsyncIterator[OllamaChunk]:
+        """Stream /api/generate chunks"""
+        payload = self._apply_defaults({
+            "model": self.model,
+            "prompt": prompt,
+            **kwargs
+        })
+        return self._stream_chunks("/api/generate", payload, timeout)
+    
+    def _chat_chunks(self, messages: list, timeout: Optional[float] = None, **kwargs) -> AsyncIterator[OllamaChunk]:
+        """Stream /api/chat chunks"""
+        payload = self._apply_defaults({
+            "model": self.model,
+            "messages": messages,
+            **kwargs
+        })
+        return self._stream_chunks("/api/chat", payload, timeout)
+    
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Generate text using Ollama, yielding it as it is produced
+        
+        Args:
+            prompt: Input prompt for generation
+            **kwargs: Additional generation parameters (timeout=... overrides
+                the worker timeout)
+        
+        Yields:
+            Generated text fragments
+        """
+        async for chunk in self._generate_chunks(prompt, **kwargs):
+            if chunk.response:
+                yield chunk.response
+    
+    async def chat_stream(self, messages: list, **kwargs) -> AsyncIterator[str]:
+        """
+        Chat completion using Ollama, yielding the reply as it is produced
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            **kwargs: Additional chat parameters (timeout=... overrides
+                the worker timeout)
+        
+        Yields:
+            Assistant message fragments
+        """
+        async for chunk in self._chat_chunks(messages, **kwargs):
+            if chunk.message is not None and chunk.message.content:
+                yield chunk.message.content
+    
     async def generate(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         Generate text using Ollama
         
+        The response is streamed from Ollama and joined here, so tokens are
+        received as they are generated and time to first token is reported.
+        
         Args:
             prompt: Input prompt for generation
-            **kwargs: Additional generation parameters
+            **kwargs: Additional generation parameters (timeout=... overrides
+                the worker timeout)
         
         Returns:
             Dictionary with generation result
         """
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter_ns()
         
         try:
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                **kwargs
-            }
+            model = kwargs.get("model") or self.model
+            logger.info(f"Sending generation request to Ollama (model: {model})")
             
-            logger.info(f"Sending generation request to Ollama (model: {self.model})")
+            time_to_first_token = None
+            parts = []
+            final = None
             
-            # Send request to Ollama
-            response = await self.client.post(
-                f"{self.base_url}/api/generate",
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+            async for chunk in self._generate_chunks(prompt, **kwargs):
+                text = chunk.response
+                if text:
+                    if time_to_first_token is None:
+                        time_to_first_token = (time.perf_counter_ns() - start_time) / 1e6
+                    parts.append(text)
+                if chunk.done:
+                    final = chunk
             
-            result = response.json()
-            
-            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            processing_time = (time.perf_counter_ns() - start_time) / 1e6
             
             logger.info(f"Generation completed in {processing_time:.2f}ms")
             
             return {
-                "output": result.get("response", ""),
-                "model": self.model,
+                "output": "".join(parts),
+                "model": model,
                 "processing_time_ms": processing_time,
-                "total_duration": result.get("total_duration"),
-                "load_duration": result.get("load_duration"),
-                "prompt_eval_count": result.get("prompt_eval_count"),
-                "eval_count": result.get("eval_count"),
+                "time_to_first_token_ms": time_to_first_token,
+                **_chunk_stats(final),
                 "status": "success"
             }
             
@@ -133,50 +376,51 @@ class OllamaWorker:
         """
         Chat completion using Ollama
         
+        The reply is streamed from Ollama and joined here, so tokens are
+        received as they are generated and time to first token is reported.
+        
         Args:
             messages: List of message dictionaries with 'role' and 'content'
-            **kwargs: Additional chat parameters
+            **kwargs: Additional chat parameters (timeout=... overrides
+                the worker timeout)
         
         Returns:
             Dictionary with chat completion result
         """
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter_ns()
         
         try:
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "stream": False,
-                **kwargs
-            }
-            
-            logger.info(f"Sending chat request to Ollama (model: {self.model})")
-            
-            # Send request to Ollama
-            response = await self.client.post(
-                f"{self.base_url}/api/chat",
-                json=payload
-            )
+            model = kwargs.get("model") or self.model
+            logger.info(f"Sending chat request to Ollama (model: {model})")
             
-            if response.status_code != 200:
-                raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+            time_to_first_token = None
+            parts = []
+            role = "assistant"
+            final = None
             
-            result = response.json()
+            async for chunk in self._chat_chunks(messages, **kwargs):
+                message = chunk.message
+                if message is not None:
+                    role = message.role
+                    if message.content:
+                        if time_to_first_token is None:
+                            time_to_first_token = (time.perf_counter_ns() - start_time) / 1e6
+                        parts.append(message.content)
+                if chunk.done:
+                    final = chunk
             
-            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            processing_time = (time.perf_counter_ns() - start_time) / 1e6
             
             logger.info(f"Chat completed in {processing_time:.2f}ms")
             
+            output = "".join(parts)
             return {
-                "output": result.get("message", {}).get("content", ""),
-                "message": result.get("message"),
-                "model": self.model,
+                "output": output,
+                "message": {"role": role, "content": output},
+                "model": model,
                 "processing_time_ms": processing_time,
-                "total_duration": result.get("total_duration"),
-                "load_duration": result.get("load_duration"),
-                "prompt_eval_count": result.get("prompt_eval_count"),
-                "eval_count": result.get("eval_count"),
+                "time_to_first_token_ms": time_to_first_token,
+                **_chunk_stats(final),
                 "status": "success"
             }
             
@@ -187,6 +431,34 @@ class OllamaWorker:
                 "status": "failed"
             }
     
+    @staticmethod
+    def _request_kwargs(data: Dict[str, Any], input_key: str, value: Any, call_keys: frozenset) -> Dict[str, Any]:
+        """
+        Build generate/chat kwargs from the fields of an inference() payload
+        that Ollama understands
+        
+        Sampling parameters given at the top level (temperature, top_p, ...)
+        are moved into "options", and max_tokens becomes options.num_predict
+        (an explicit num_predict wins). Anything else (request metadata) is
+        not forwarded. A payload that already holds only call_keys is
+        returned as-is instead of being copied.
+        """
+        if data.keys() <= call_keys and data.get(input_key) is value:
+            return data
+        
+        kwargs = {key: data[key] for key in data.keys() & OLLAMA_REQUEST_KEYS}
+        kwargs[input_key] = value
+        option_keys = data.keys() & OLLAMA_OPTION_KEYS
+        max_tokens = data.get("max_tokens")
+        if option_keys or max_tokens is not None:
+            options = dict(kwargs.get("options") or {})
+            if max_tokens is not None:
+                options.setdefault("num_predict", max_tokens)
+            for key in option_keys:
+                options[key] = data[key]
+            kwargs["options"] = options
+        return kwargs
+    
     async def inference(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Main inference method compatible with Ray worker interface
@@ -202,15 +474,13 @@ class OllamaWorker:
             if "messages" in data:
                 # Chat completion
                 return await self.chat(
-                    messages=data["messages"],
-                    **{k: v for k, v in data.items() if k != "messages"}
+                    **self._request_kwargs(data, "messages", data["messages"], CHAT_CALL_KEYS)
                 )
             elif "prompt" in data or "text" in data:
                 # Text generation
                 prompt = data.get("prompt") or data.get("text", "")
                 return await self.generate(
-                    prompt=prompt,
-                    **{k: v for k, v in data.items() if k not in ["prompt", "text"]}
+                    **self._request_kwargs(data, "prompt", prompt, GENERATE_CALL_KEYS)
                 )
             else:
                 # Default: treat entire data as prompt
@@ -233,6 +503,20 @@ class OllamaWorker:
 
 # Singleton instance
 _ollama_worker: Optional[OllamaWorker] = None
+# Serializes creation/teardown so concurrent callers share one worker.
+# asyncio locks bind to a loop, so one is created per running loop.
+_init_lock: Optional[asyncio.Lock] = None
+_init_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_init_lock() -> asyncio.Lock:
+    """Return the singleton init lock for the running event loop"""
+    global _init_lock, _init_lock_loop
+    loop = asyncio.get_running_loop()
+    if _init_lock is None or _init_lock_loop is not loop:
+        _init_lock = asyncio.Lock()
+        _init_lock_loop = loop
+    return _init_lock
 
 
 async def get_ollama_worker(base_url: str = "http://localhost:11434", 
@@ -252,16 +536,21 @@ async def get_ollama_worker(base_url: str = "http://localhost:11434",
     global _ollama_worker
     
     if _ollama_worker is None:
-        _ollama_worker = OllamaWorker(base_url=base_url, model=model, timeout=timeout)
-        
-        # Verify Ollama is accessible
-        if not await _ollama_worker.health_check():
-            logger.warning("Ollama health check failed - service may not be running")
-        else:
-            models = await _ollama_worker.list_models()
-            logger.info(f"Available Ollama models: {models}")
-            if model not in models:
-                logger.warning(f"Model '{model}' not found in Ollama. Available models: {models}")
+        async with _get_init_lock():
+            # Another caller may have finished initializing while we waited
+            if _ollama_worker is None:
+                worker = OllamaWorker(base_url=base_url, model=model, timeout=timeout)
+                
+                # Verify Ollama is accessible
+                if not await worker.health_check():
+                    logger.warning("Ollama health check failed - service may not be running")
+                else:
+                    models = await worker.list_models()
+                    logger.info(f"Available Ollama models: {models}")
+                    if model not in models:
+                        logger.warning(f"Model '{model}' not found in Ollama. Available models: {models}")
+                
+                _ollama_worker = worker
     
     return _ollama_worker
 
@@ -269,6 +558,7 @@ async def get_ollama_worker(base_url: str = "http://localhost:11434",
 async def close_ollama_worker():
     """Close the Ollama worker singleton"""
     global _ollama_worker
-    if _ollama_worker is not None:
-        await _ollama_worker.close()
-        _ollama_worker = None
+    async with _get_init_lock():
+        if _ollama_worker is not None:
+            await _ollama_worker.close()
+            _ollama_worker = None
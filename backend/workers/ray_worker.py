@@ -5,18 +5,75 @@ This module implements the GPU inference worker using Ray Serve.
 It handles model loading, batching, and GPU allocation automatically.
 """
 
+import os
+
+# Replicas share the node's cores and spend most of a batch waiting on the
+# GPU, so keep each one's OpenMP/MKL pools to one thread (read at torch import)
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+    if not os.environ.get(_var):
+        os.environ[_var] = "1"
+
 import ray
 from ray import serve
 import torch
+import numpy as np
 import logging
-import os
 from typing import Dict, Any, List
 import asyncio
-from datetime import datetime
+import base64
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model input width (features per request) and the largest batch Ray Serve
+# hands to handle_batch; persistent input buffers are sized from these
+INPUT_DIM = 768
+SERVE_MAX_BATCH_SIZE = 32
+
+# Batch sizes captured as CUDA graphs; batches are padded up to the next bucket
+GRAPH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+# Intra-op threads per replica; follows OMP_NUM_THREADS unless set (empty
+# values count as unset)
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS") or os.getenv("OMP_NUM_THREADS") or 1)
+
+# Ray sets OMP_NUM_THREADS per actor from num_cpus, overriding the defaults
+# above, so pass the thread limits explicitly into every replica's environment
+REPLICA_RUNTIME_ENV = {
+    "env_vars": {
+        "OMP_NUM_THREADS": str(TORCH_NUM_THREADS),
+        "MKL_NUM_THREADS": str(TORCH_NUM_THREADS),
+        "TORCH_NUM_THREADS": str(TORCH_NUM_THREADS),
+    }
+}
+
+
+def limit_torch_threads():
+    """Cap PyTorch's intra-op and inter-op thread pools for this replica"""
+    torch.set_num_threads(TORCH_NUM_THREADS)
+    try:
+        torch.set_num_interop_threads(TORCH_NUM_THREADS)
+    except RuntimeError:
+        # Only allowed once, before any inter-op work has started
+        pass
+
+
+def encode_output(output: np.ndarray, raw: bool = False) -> Dict[str, Any]:
+    """
+    Serialize a model output for the response
+    
+    By default the output is a (nested) JSON list. With raw=True the array
+    bytes are returned base64-encoded instead, which skips boxing every
+    element as a Python float; clients decode with the returned dtype.
+    """
+    if raw:
+        return {
+            "output_b64": base64.b64encode(output.tobytes()).decode("ascii"),
+            "dtype": str(output.dtype)
+        }
+    return {"output": output.tolist()}
+
 # ============================================
 # Model Loader
 # ============================================
@@ -83,7 +140,8 @@ class ModelLoader:
     num_replicas=3,  # Number of replicas (should match number of GPUs)
     ray_actor_options={
         "num_gpus": 1,  # Each replica gets 1 GPU
-        "num_cpus": 4   # 4 CPU cores per replica
+        "num_cpus": 2,  # CPU work is request marshaling; compute is on the GPU
+        "runtime_env": REPLICA_RUNTIME_ENV
     },
     max_concurrent_queries=10,  # Max concurrent requests per replica
     autoscaling_config={
@@ -105,6 +163,8 @@ class InferenceModel:
     
     def __init__(self):
         """Initialize the model on GPU"""
+        limit_torch_threads()
+        
         self.model_path = os.getenv("MODEL_PATH", "/models")
         self.batch_size = int(os.getenv("BATCH_SIZE", "32"))
         self.max_batch_wait_ms = int(os.getenv("MAX_BATCH_WAIT_MS", "100"))
@@ -117,6 +177,41 @@ class InferenceModel:
         # Load model
         self.loader = ModelLoader(self.model_path)
         self.model = self.loader.load_model()
+        self._device_str = str(self.loader.device)
+        
+        # Mixed precision on GPU: TF32 for any FP32 matmuls left, BF16 autocast
+        # (FP16 on GPUs without BF16 support) for the forward pass
+        use_cuda = self.loader.device.type == "cuda"
+        self._use_amp = use_cuda
+        self._amp_dtype = torch.float16
+        if use_cuda:
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            if torch.cuda.is_bf16_supported():
+                self._amp_dtype = torch.bfloat16
+        
+        # Persistent input buffers: requests are staged in (pinned) host memory
+        # and copied to the GPU in one DMA, with no per-batch allocation
+        capacity = max(self.batch_size, SERVE_MAX_BATCH_SIZE)
+        self._pinned = torch.empty((capacity, INPUT_DIM), dtype=torch.float32, pin_memory=use_cuda)
+        self._gpu_batch = torch.zeros((capacity, INPUT_DIM), dtype=torch.float32, device=self.loader.device)
+        # NumPy view of the staging buffer: request rows are filled in C, in place
+        self._pinned_np = self._pinned.numpy()
+        self._rng = np.random.default_rng()
+        # Pinned output buffer, allocated once the output shape is known
+        self._pinned_out = None
+        
+        # On GPU, compile the model with torch.compile (mode="reduce-overhead"
+        # records CUDA graphs itself); TORCH_COMPILE=0 keeps the eager model,
+        # which is also the fallback if compilation fails
+        self._eager_model = self.model
+        self._compiled = use_cuda and os.getenv("TORCH_COMPILE", "1") == "1"
+        if self._compiled:
+            self.model = torch.compile(self._eager_model, mode="reduce-overhead", fullgraph=True, dynamic=False)
+        
+        # Manually captured CUDA graphs keyed by bucket size: (graph, static output);
+        # used when the model is not compiled
+        self._graphs = {}
         
         # Warm up model
         self._warmup()
@@ -128,13 +223,105 @@ class InferenceModel:
         try:
             logger.info("Warming up model...")
             dummy_input = torch.randn(1, 768).to(self.loader.device)
-            with torch.no_grad():
-                _ = self.model(dummy_input)
+            with torch.inference_mode(), self._autocast():
+                _ = self._eager_model(dummy_input)
             logger.info("Model warmup complete")
         except Exception as e:
             logger.warning(f"Warmup failed: {str(e)}")
+        
+        if self._compiled:
+            try:
+                self._warmup_compiled()
+                logger.info(f"Compiled model for batch sizes {list(GRAPH_BUCKETS)}")
+            except Exception as e:
+                self.model = self._eager_model
+                self._compiled = False
+                logger.warning(f"torch.compile failed, falling back to eager mode: {str(e)}")
+        
+        if self.loader.device.type == "cuda" and not self._compiled:
+            try:
+                self._capture_graphs()
+                logger.info(f"Captured CUDA graphs for batch sizes {sorted(self._graphs)}")
+            except Exception as e:
+                self._graphs.clear()
+                logger.warning(f"CUDA graph capture failed, using eager mode: {str(e)}")
     
-    @serve.batch(max_batch_size=32, batch_wait_timeout_s=0.1)
+    def _warmup_compiled(self):
+        """Compile and record the model for every bucket size before serving"""
+        with torch.inference_mode(), self._autocast():
+            for bs in GRAPH_BUCKETS:
+                for _ in range(3):
+                    self.model(self._gpu_batch[:bs])
+        torch.cuda.synchronize()
+    
+    def _capture_graphs(self):
+        """Record one CUDA graph per bucket over the persistent device batch"""
+        # Warm up every bucket shape on a side stream before capture
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream), torch.inference_mode(), self._autocast():
+            for bs in GRAPH_BUCKETS:
+                for _ in range(3):
+                    self.model(self._gpu_batch[:bs])
+        torch.cuda.current_stream().wait_stream(stream)
+        
+        # Largest first so the smaller graphs reuse its memory pool
+        pool = torch.cuda.graph_pool_handle()
+        for bs in reversed(GRAPH_BUCKETS):
+            graph = torch.cuda.CUDAGraph()
+            with torch.inference_mode(), self._autocast(), torch.cuda.graph(graph, pool=pool):
+                static_out = self.model(self._gpu_batch[:bs])
+            self._graphs[bs] = (graph, static_out)
+    
+    def _autocast(self):
+        """Autocast context for the forward pass (a no-op on CPU)"""
+        # The autocast weight cache must stay off for CUDA graph capture
+        return torch.autocast(
+            self.loader.device.type, dtype=self._amp_dtype, enabled=self._use_amp, cache_enabled=False
+        )
+    
+    def _forward(self, n: int) -> torch.Tensor:
+        """
+        Run the model on the first n rows of the persistent device batch
+        
+        Batches are padded to the next bucket size, which runs the compiled
+        model or replays the captured CUDA graph for that bucket; batches
+        beyond the largest bucket run eagerly. The returned tensor may be a
+        view of a static graph output and is only valid until the next call.
+        """
+        bs = 1 << (n - 1).bit_length()
+        if bs > GRAPH_BUCKETS[-1]:
+            return self._eager_model(self._gpu_batch[:n])
+        
+        if self._compiled:
+            self._gpu_batch[n:bs].zero_()
+            return self.model(self._gpu_batch[:bs])[:n]
+        
+        entry = self._graphs.get(bs)
+        if entry is None:
+            return self.model(self._gpu_batch[:n])
+        
+        graph, static_out = entry
+        self._gpu_batch[n:bs].zero_()
+        graph.replay()
+        return static_out[:n]
+    
+    def _to_host(self, batch_output: torch.Tensor) -> np.ndarray:
+        """Copy a batch of outputs to the pinned host buffer with a single sync"""
+        n = batch_output.shape[0]
+        use_cuda = self.loader.device.type == "cuda"
+        if self._pinned_out is None or self._pinned_out.shape[1:] != batch_output.shape[1:]:
+            self._pinned_out = torch.empty(
+                (self._pinned.shape[0], *batch_output.shape[1:]), dtype=torch.float32, pin_memory=use_cuda
+            )
+        
+        host_out = self._pinned_out[:n]
+        host_out.copy_(batch_output, non_blocking=True)
+        if use_cuda:
+            torch.cuda.current_stream().synchronize()
+        return host_out.numpy()
+    
+    @serve.batch(max_batch_size=SERVE_MAX_BATCH_SIZE, batch_wait_timeout_s=0.1)
     async def handle_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Handle a batch of inference requests
@@ -147,59 +334,66 @@ class InferenceModel:
         Returns:
             List of result dictionaries
         """
-        batch_start = datetime.utcnow()
+        batch_start = time.perf_counter_ns()
         logger.info(f"Processing batch of {len(requests)} requests")
         
         try:
-            # Extract input data from requests
-            batch_inputs = []
-            for req in requests:
+            n = len(requests)
+            host_in = self._pinned_np[:n]
+            
+            # Stage inputs in the pinned host buffer
+            dummy_rows = []
+            for i, req in enumerate(requests):
                 # This is a placeholder - adapt to your actual input format
                 input_data = req.get("data", {})
                 
-                # Convert input to tensor
                 # Example: if input is text, you'd tokenize here
-                # For now, we'll create dummy tensors
                 if isinstance(input_data, dict) and "tensor" in input_data:
-                    tensor = torch.tensor(input_data["tensor"])
+                    host_in[i] = input_data["tensor"]
                 else:
-                    # Create dummy tensor for demonstration
-                    tensor = torch.randn(768)
-                
-                batch_inputs.append(tensor)
+                    dummy_rows.append(i)
             
-            # Stack into batch
-            batch_tensor = torch.stack(batch_inputs).to(self.loader.device)
+            if dummy_rows:
+                # Random inputs for demonstration, generated in one call
+                host_in[dummy_rows] = self._rng.standard_normal((len(dummy_rows), INPUT_DIM), dtype=np.float32)
+            
+            # One host-to-device copy into the persistent device batch
+            self._gpu_batch[:n].copy_(self._pinned[:n], non_blocking=True)
             
             # Run inference
-            with torch.no_grad():
-                batch_output = self.model(batch_tensor)
+            with torch.inference_mode(), self._autocast():
+                batch_output = self._forward(n)
+            
+            # One device-to-host transfer for the whole batch
+            host_out = self._to_host(batch_output)
+            batch_time = (time.perf_counter_ns() - batch_start) / 1e6
             
-            # Convert outputs to list of dicts
-            results = []
-            for i, output in enumerate(batch_output):
-                result = {
-                    "output": output.cpu().numpy().tolist(),
-                    "shape": list(output.shape),
-                    "device": str(self.loader.device),
-                    "batch_size": len(requests),
-                    "processing_time_ms": (datetime.utcnow() - batch_start).total_seconds() * 1000
+            # Convert outputs to list of dicts; fields shared by the batch are built once
+            # (shape is a tuple so the shared value cannot be mutated through one result)
+            row_shape = tuple(host_out.shape[1:])
+            # JSON outputs: one C-level tolist() over the host array instead of one per row
+            json_rows = host_out.tolist() if any(not req.get("raw") for req in requests) else [None] * n
+            results = [
+                {
+                    **(encode_output(row, raw=True) if req.get("raw") else {"output": json_row}),
+                    "shape": row_shape,
+                    "device": self._device_str,
+                    "batch_size": n,
+                    "processing_time_ms": batch_time
                 }
-                results.append(result)
+                for req, row, json_row in zip(requests, host_out, json_rows)
+            ]
             
-            batch_time = (datetime.utcnow() - batch_start).total_seconds() * 1000
-            logger.info(f"Batch processed in {batch_time:.2f}ms ({batch_time/len(requests):.2f}ms per request)")
+            logger.info(f"Batch processed in {batch_time:.2f}ms ({batch_time/n:.2f}ms per request)")
             
             return results
             
         except Exception as e:
             logger.error(f"Error processing batch: {str(e)}")
-            # Return error for all requests in batch
-            error_result = {
-                "error": str(e),
-                "status": "failed"
-            }
-            return [error_result] * len(requests)
+            # Return error for all requests in batch, one dict each so no two
+            # results alias the same object
+            error_items = (("error", str(e)), ("status", "failed"))
+            return [dict(error_items) for _ in requests]
     
     async def __call__(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -233,7 +427,7 @@ class InferenceModel:
 @serve.deployment(
     name="InferenceModelNoBatch",
     num_replicas=3,
-    ray_actor_options={"num_gpus": 1, "num_cpus": 4}
+    ray_actor_options={"num_gpus": 1, "num_cpus": 2, "runtime_env": REPLICA_RUNTIME_ENV}
 )
 class InferenceModelNoBatch:
     """
@@ -244,42 +438,52 @@ class InferenceModelNoBatch:
     """
     
     def __init__(self):
+        limit_torch_threads()
+        
         self.model_path = os.getenv("MODEL_PATH", "/models")
         self.loader = ModelLoader(self.model_path)
         self.model = self.loader.load_model()
+        self._device_str = str(self.loader.device)
+        
+        # Persistent single-row input buffers, reused by every request
+        use_cuda = self.loader.device.type == "cuda"
+        self._pinned_in = torch.empty((1, INPUT_DIM), dtype=torch.float32, pin_memory=use_cuda)
+        self._pinned_in_np = self._pinned_in.numpy()
+        self._gpu_in = torch.empty((1, INPUT_DIM), dtype=torch.float32, device=self.loader.device)
+        
         self._warmup()
     
     def _warmup(self):
         dummy_input = torch.randn(1, 768).to(self.loader.device)
-        with torch.no_grad():
+        with torch.inference_mode():
             _ = self.model(dummy_input)
     
     async def __call__(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Process single request without batching"""
         try:
-            start_time = datetime.utcnow()
+            start_time = time.perf_counter_ns()
             
             # Extract input
             input_data = request.get("data", {})
             
-            # Convert to tensor
+            # Stage in the pinned host buffer
             if isinstance(input_data, dict) and "tensor" in input_data:
-                input_tensor = torch.tensor(input_data["tensor"])
+                self._pinned_in_np[0] = input_data["tensor"]
             else:
-                input_tensor = torch.randn(768)
+                self._pinned_in.normal_()
             
-            input_tensor = input_tensor.unsqueeze(0).to(self.loader.device)
+            self._gpu_in.copy_(self._pinned_in, non_blocking=True)
             
             # Run inference
-            with torch.no_grad():
-                output = self.model(input_tensor)
+            with torch.inference_mode():
+                output = self.model(self._gpu_in)
             
-            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            processing_time = (time.perf_counter_ns() - start_time) / 1e6
             
             return {
-                "output": output.cpu().numpy().tolist(),
+                **encode_output(output.cpu().numpy(), request.get("raw", False)),
                 "shape": list(output.shape),
-                "device": str(self.loader.device),
+                "device": self._device_str,
                 "processing_time_ms": processing_time
             }
             
@@ -328,7 +532,6 @@ if __name__ == "__main__":
     # Keep running
     logger.info("Press Ctrl+C to stop")
     try:
-        import time
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
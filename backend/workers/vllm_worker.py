@@ -16,12 +16,67 @@ Usage:
 
 import logging
 import asyncio
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import importlib.util
+import json
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, AsyncIterator
 import httpx
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+    
+    def _json_dumps_sorted(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:  # orjson is optional; fall back to the stdlib
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    _json_loads = json.loads
+    
+    def _json_dumps_sorted(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# HTTP/2 multiplexes concurrent requests over one connection; it needs the
+# optional h2 package (pip install "httpx[http2]") and an https:// endpoint
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Distinct prompts whose token ids are kept per model (pretokenize=True)
+TOKEN_CACHE_SIZE = 1024
+
+# Callers reach _get_encoder from worker threads; this keeps concurrent
+# first calls from each loading the tokenizer
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder(model: str):
+    """
+    Load a model's tokenizer once per process and return a cached encoder
+    
+    Cached by model name, so workers rebuilt for the same model reuse both
+    the tokenizer and its prompt -> token ids cache.
+    """
+    with _encoder_lock:
+        return _load_encoder(model)
+
+
+@lru_cache(maxsize=None)
+def _load_encoder(model: str):
+    """Load the tokenizer and build the encoder (called under _encoder_lock)"""
+    from transformers import AutoTokenizer
+    
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    logger.info(f"Loaded tokenizer for '{model}'; prompts are sent as token ids")
+    
+    # Tuples, so cached ids can't be mutated by a caller
+    return lru_cache(maxsize=TOKEN_CACHE_SIZE)(lambda text: tuple(tokenizer.encode(text)))
+
 
 class VLLMWorker:
     """
@@ -29,9 +84,19 @@ class VLLMWorker:
     
     This class provides the same interface as OllamaWorker but uses
     vLLM's OpenAI-compatible API for better performance.
+    
+    With microbatch=True, concurrent generate() calls are coalesced: prompts
+    arriving within MICROBATCH_WAIT_MS of each other (and sharing sampling
+    parameters) are sent as one /v1/completions request with a list of
+    prompts. This only pays off when many generate() calls run concurrently
+    on one event loop; otherwise every prompt is sent straight away.
     """
     
-    def __init__(self, base_url: str = "http://localhost:8000", model: str = "Qwen/Qwen2.5-Coder-7B-Instruct", timeout: int = 120):
+    MICROBATCH_WAIT_MS = 5.0  # how long the first queued prompt waits for company
+    MICROBATCH_MAX_SIZE = 32  # prompts per coalesced request
+    
+    def __init__(self, base_url: str = "http://localhost:8000", model: str = "Qwen/Qwen2.5-Coder-7B-Instruct", timeout: int = 120,
+                 pretokenize: bool = False, microbatch: bool = False):
         """
         Initialize vLLM worker
         
@@ -39,11 +104,41 @@ class VLLMWorker:
             base_url: vLLM server endpoint
             model: Model name (HuggingFace model ID)
             timeout: Request timeout in seconds
+            pretokenize: Tokenize generate() prompts here and send token ids,
+                so vLLM skips tokenization (needs the optional transformers
+                package and the model's tokenizer)
+            microbatch: Coalesce concurrent generate() calls into batched
+                completion requests
         """
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.pretokenize = pretokenize
+        self.microbatch = microbatch
+        # Cached prompt -> token ids function, loaded on first use
+        self._encode = None
+        
+        # One pooled keep-alive client shared by every call; the transport
+        # retries failed connection attempts once
+        transport = httpx.AsyncHTTPTransport(
+            retries=1,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=256,
+                max_keepalive_connections=128
+            )
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            transport=transport
+        )
+        
+        # Microbatching state; the dispatcher task is started on first use
+        # since there may be no running event loop yet
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._inflight: set = set()
         
         logger.info(f"Initialized VLLMWorker with model '{model}' at {base_url}")
         logger.info("vLLM provides continuous batching for better GPU utilization")
@@ -56,7 +151,7 @@ class VLLMWorker:
             True if vLLM is healthy, False otherwise
         """
         try:
-            response = await self.client.get(f"{self.base_url}/v1/models")
+            response = await self.client.get("/v1/models")
             return response.status_code == 200
         except Exception as e:
             logger.error(f"vLLM health check failed: {str(e)}")
@@ -70,19 +165,138 @@ class VLLMWorker:
             List of model names
         """
         try:
-            response = await self.client.get(f"{self.base_url}/v1/models")
+            response = await self.client.get("/v1/models")
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 return [model["id"] for model in data.get("data", [])]
             return []
         except Exception as e:
             logger.error(f"Failed to list models: {str(e)}")
             return []
     
+    @staticmethod
+    def _sampling_params(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """OpenAI-format sampling parameters with defaults, None values removed"""
+        params = {
+            "max_tokens": kwargs.get("max_tokens", 512),
+            "temperature": kwargs.get("temperature", 0.7),
+            "top_p": kwargs.get("top_p", 1.0),
+            "stop": kwargs.get("stop")
+        }
+        return {k: v for k, v in params.items() if v is not None}
+    
+    async def _stream_events(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """POST with "stream": true and yield each server-sent event as it arrives"""
+        body = _json_dumps({**payload, "stream": True})
+        async with self.client.stream("POST", path, content=body, headers=JSON_HEADERS) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"vLLM API error: {response.status_code} - {response.text}")
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    return
+                yield _json_loads(data)
+    
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Generate text using vLLM, yielding it as it is produced
+        
+        Streamed prompts are sent on their own, not coalesced with others.
+        
+        Args:
+            prompt: Input prompt for generation
+            **kwargs: Additional generation parameters
+        
+        Yields:
+            Generated text fragments
+        """
+        payload = {"model": self.model, "prompt": prompt, **self._sampling_params(kwargs)}
+        async for event in self._stream_events("/v1/completions", payload):
+            choices = event.get("choices")
+            if choices and choices[0].get("text"):
+                yield choices[0]["text"]
+    
+    async def chat_stream(self, messages: list, **kwargs) -> AsyncIterator[str]:
+        """
+        Chat completion using vLLM, yielding the reply as it is produced
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            **kwargs: Additional chat parameters
+        
+        Yields:
+            Assistant message fragments
+        """
+        payload = {"model": self.model, "messages": messages, **self._sampling_params(kwargs)}
+        async for event in self._stream_events("/v1/chat/completions", payload):
+            choices = event.get("choices")
+            if choices:
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+    
+    async def _collect_stream(self, fragments: AsyncIterator[str], chat: bool = False) -> Dict[str, Any]:
+        """Consume a generate_stream/chat_stream into a generate()/chat()-style result"""
+        start_time = time.perf_counter_ns()
+        
+        try:
+            time_to_first_token = None
+            parts = []
+            async for text in fragments:
+                if time_to_first_token is None:
+                    time_to_first_token = (time.perf_counter_ns() - start_time) / 1e6
+                parts.append(text)
+            
+            processing_time = (time.perf_counter_ns() - start_time) / 1e6
+            
+            logger.info(f"Streamed {'chat' if chat else 'generation'} completed in {processing_time:.2f}ms")
+            
+            output = "".join(parts)
+            result = {
+                "output": output,
+                "model": self.model,
+                "processing_time_ms": processing_time,
+                "time_to_first_token_ms": time_to_first_token,
+                "status": "success"
+            }
+            if chat:
+                result["message"] = {"role": "assistant", "content": output}
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error during streamed {'chat' if chat else 'generation'}: {str(e)}")
+            return {
+                "error": str(e),
+                "status": "failed"
+            }
+    
+    async def _prompt_input(self, prompt: str):
+        """The prompt as sent to vLLM: token ids when pretokenizing, else the text"""
+        if not self.pretokenize:
+            return prompt
+        
+        if self._encode is None:
+            try:
+                self._encode = await asyncio.to_thread(_get_encoder, self.model)
+            except Exception as e:
+                logger.warning(f"Tokenizer unavailable, sending prompts as text: {str(e)}")
+                self.pretokenize = False
+                return prompt
+        
+        return self._encode(prompt)
+    
     async def generate(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         Generate text using vLLM
         
+        With microbatching on, the prompt is queued and sent together with
+        other concurrent prompts; "usage" then covers the whole coalesced
+        request.
+        
         Args:
             prompt: Input prompt for generation
             **kwargs: Additional generation parameters
@@ -90,47 +304,35 @@ class VLLMWorker:
         Returns:
             Dictionary with generation result
         """
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter_ns()
         
         try:
-            # Prepare request payload (OpenAI format)
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "max_tokens": kwargs.get("max_tokens", 512),
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_p": kwargs.get("top_p", 1.0),
-                "stream": False
-            }
+            # Only prompts with equal sampling parameters share a request
+            params = self._sampling_params(kwargs)
             
-            # Remove None values
-            payload = {k: v for k, v in payload.items() if v is not None}
-            
-            logger.info(f"Sending generation request to vLLM (model: {self.model})")
-            
-            # Send request to vLLM
-            response = await self.client.post(
-                f"{self.base_url}/v1/completions",
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"vLLM API error: {response.status_code} - {response.text}")
+            prompt_input = await self._prompt_input(prompt)
             
-            result = response.json()
+            future = asyncio.get_running_loop().create_future()
+            item = (prompt_input, params, future)
+            if self.microbatch:
+                self._get_queue().put_nowait(item)
+            else:
+                await self._send_batch([item])
+            choice, usage, batch_size = await future
             
-            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            processing_time = (time.perf_counter_ns() - start_time) / 1e6
             
-            logger.info(f"Generation completed in {processing_time:.2f}ms")
+            logger.info(f"Generation completed in {processing_time:.2f}ms (batch of {batch_size})")
             
             # Extract output
-            output = result["choices"][0]["text"] if result.get("choices") else ""
+            output = choice.get("text", "") if choice else ""
             
             return {
                 "output": output,
                 "model": self.model,
                 "processing_time_ms": processing_time,
-                "usage": result.get("usage", {}),
+                "usage": usage,
+                "batch_size": batch_size,
                 "status": "success"
             }
             
@@ -141,6 +343,107 @@ class VLLMWorker:
                 "status": "failed"
             }
     
+    def _get_queue(self) -> asyncio.Queue:
+        """Return the microbatch queue, (re)starting the dispatcher on this loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._dispatcher = loop.create_task(self._dispatch_loop(self._queue))
+        return self._queue
+    
+    async def _dispatch_loop(self, queue: asyncio.Queue):
+        """Collect queued prompts for up to MICROBATCH_WAIT_MS and send them in groups"""
+        loop = asyncio.get_running_loop()
+        window = self.MICROBATCH_WAIT_MS / 1000
+        
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + window
+            try:
+                while len(batch) < self.MICROBATCH_MAX_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                
+                # One request per distinct set of sampling parameters (text and
+                # token-id prompts can't be mixed in one request either);
+                # params are keyed by their JSON so list values (e.g. stop) work
+                groups: Dict[tuple, list] = {}
+                for item in batch:
+                    try:
+                        key = (isinstance(item[0], str), _json_dumps_sorted(item[1]))
+                    except Exception as e:
+                        if not item[2].done():
+                            item[2].set_exception(e)
+                        continue
+                    groups.setdefault(key, []).append(item)
+                
+                # Send without blocking the next collection window
+                for group in groups.values():
+                    task = loop.create_task(self._send_batch(group))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+            
+            except asyncio.CancelledError:
+                # Shutting down: don't leave the collected callers waiting
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+            
+            except Exception as e:
+                # Fail this batch's callers but keep the dispatcher alive
+                logger.error(f"Microbatch dispatch failed: {str(e)}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def _send_batch(self, group: list):
+        """Send one coalesced completion request and resolve each caller's future"""
+        prompts = [prompt for prompt, _, _ in group]
+        payload = {
+            "model": self.model,
+            # A single prompt is sent on its own (a string or one id list)
+            "prompt": prompts[0] if len(prompts) == 1 else prompts,
+            **group[0][1],
+            "stream": False
+        }
+        
+        try:
+            logger.info(f"Sending generation request to vLLM (model: {self.model}, prompts: {len(prompts)})")
+            
+            response = await self.client.post(
+                "/v1/completions",
+                content=_json_dumps(payload),
+                headers=JSON_HEADERS
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"vLLM API error: {response.status_code} - {response.text}")
+            
+            result = _json_loads(response.content)
+            
+            # Choices carry the index of the prompt they answer
+            choices = {choice.get("index", i): choice for i, choice in enumerate(result.get("choices", []))}
+            usage = result.get("usage", {})
+            for i, (_, _, future) in enumerate(group):
+                if not future.done():
+                    future.set_result((choices.get(i), usage, len(group)))
+        
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+        
+        finally:
+            # Only reached with pending futures if this task was cancelled
+            for _, _, future in group:
+                if not future.done():
+                    future.cancel()
+    
     async def chat(self, messages: list, **kwargs) -> Dict[str, Any]:
         """
         Chat completion using vLLM
@@ -152,36 +455,32 @@ class VLLMWorker:
         Returns:
             Dictionary with chat completion result
         """
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter_ns()
         
         try:
             # Prepare request payload (OpenAI format)
             payload = {
                 "model": self.model,
                 "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 512),
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_p": kwargs.get("top_p", 1.0),
+                **self._sampling_params(kwargs),
                 "stream": False
             }
             
-            # Remove None values
-            payload = {k: v for k, v in payload.items() if v is not None}
-            
             logger.info(f"Sending chat request to vLLM (model: {self.model})")
             
             # Send request to vLLM
             response = await self.client.post(
-                f"{self.base_url}/v1/chat/completions",
-                json=payload
+                "/v1/chat/completions",
+                content=_json_dumps(payload),
+                headers=JSON_HEADERS
             )
             
             if response.status_code != 200:
                 raise Exception(f"vLLM API error: {response.status_code} - {response.text}")
             
-            result = response.json()
+            result = _json_loads(response.content)
             
-            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            processing_time = (time.perf_counter_ns() - start_time) / 1e6
             
             logger.info(f"Chat completed in {processing_time:.2f}ms")
             
@@ -209,6 +508,10 @@ class VLLMWorker:
         """
         Main inference method compatible with Ray worker interface
         
+        With "stream": true the completion is streamed from vLLM and joined,
+        which also reports time to first token. With "items": [...] each item
+        is run concurrently as its own request (see batch_inference).
+        
         Args:
             data: Input data dictionary
         
@@ -216,20 +519,30 @@ class VLLMWorker:
             Result dictionary
         """
         try:
+            items = data.get("items")
+            if isinstance(items, list):
+                return {
+                    "results": await self.batch_inference(items),
+                    "model": self.model,
+                    "status": "success"
+                }
+            
+            stream = bool(data.get("stream"))
+            
             # Determine inference type based on input data
             if "messages" in data:
                 # Chat completion
-                return await self.chat(
-                    messages=data["messages"],
-                    **{k: v for k, v in data.items() if k != "messages"}
-                )
+                kwargs = {k: v for k, v in data.items() if k != "messages"}
+                if stream:
+                    return await self._collect_stream(self.chat_stream(data["messages"], **kwargs), chat=True)
+                return await self.chat(messages=data["messages"], **kwargs)
             elif "prompt" in data or "text" in data:
                 # Text generation
                 prompt = data.get("prompt") or data.get("text", "")
-                return await self.generate(
-                    prompt=prompt,
-                    **{k: v for k, v in data.items() if k not in ["prompt", "text"]}
-                )
+                kwargs = {k: v for k, v in data.items() if k not in ["prompt", "text"]}
+                if stream:
+                    return await self._collect_stream(self.generate_stream(prompt, **kwargs))
+                return await self.generate(prompt=prompt, **kwargs)
             else:
                 # Default: treat entire data as prompt
                 return await self.generate(
@@ -243,49 +556,131 @@ class VLLMWorker:
                 "status": "failed"
             }
     
+    async def batch_inference(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several inference requests concurrently
+        
+        The requests overlap on the shared client (and, with microbatching
+        on, concurrent prompts are coalesced), so vLLM schedules them together.
+        
+        Args:
+            items: List of input data dictionaries, as accepted by inference()
+        
+        Returns:
+            List of result dictionaries, in the order of items
+        """
+        return await asyncio.gather(*(self.inference(item) for item in items))
+    
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Stop the microbatch dispatcher and close the HTTP client"""
+        try:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            # Tasks and futures of an event loop that has since been closed
+            # can't be cancelled; they are simply dropped
+            if dispatcher is not None and not dispatcher.get_loop().is_closed():
+                tasks = [dispatcher, *self._inflight]
+                for task in tasks:
+                    task.cancel()
+                if self._queue is not None:
+                    while not self._queue.empty():
+                        _, _, future = self._queue.get_nowait()
+                        future.cancel()
+                # Let the cancellations finish so no task is left pending
+                if dispatcher.get_loop() is asyncio.get_running_loop():
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            self._inflight.clear()
+            self._queue = None
+        finally:
+            await self.client.aclose()
         logger.info("VLLMWorker closed")
 
 
 # Singleton instance
 _vllm_worker: Optional[VLLMWorker] = None
+# Event loop the singleton's client was created on; its pooled connections
+# can't be used from another loop
+_vllm_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+# Serializes creation/teardown so concurrent callers share one worker.
+# asyncio locks bind to a loop, so one is created per running loop.
+_init_lock: Optional[asyncio.Lock] = None
+_init_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_init_lock() -> asyncio.Lock:
+    """Return the singleton init lock for the running event loop"""
+    global _init_lock, _init_lock_loop
+    loop = asyncio.get_running_loop()
+    if _init_lock is None or _init_lock_loop is not loop:
+        _init_lock = asyncio.Lock()
+        _init_lock_loop = loop
+    return _init_lock
+
+
+async def _close_stale_worker(worker: VLLMWorker):
+    """Close a worker created on another event loop, ignoring errors from that loop's transports"""
+    try:
+        await worker.close()
+    except Exception as e:
+        logger.warning(f"Error closing stale vLLM worker: {str(e)}")
 
 
 async def get_vllm_worker(base_url: str = "http://localhost:8000", 
                           model: str = "Qwen/Qwen2.5-Coder-7B-Instruct", 
-                          timeout: int = 120) -> VLLMWorker:
+                          timeout: int = 120,
+                          pretokenize: bool = False,
+                          microbatch: bool = False) -> VLLMWorker:
     """
     Get or create vLLM worker singleton
     
+    A worker created on a different event loop (e.g. by an earlier task
+    that ran its own loop) is closed and replaced.
+    
     Args:
         base_url: vLLM server endpoint
         model: Model name to use
         timeout: Request timeout in seconds
+        pretokenize: Send generate() prompts as token ids
+        microbatch: Coalesce concurrent generate() calls
     
     Returns:
         VLLMWorker instance
     """
-    global _vllm_worker
+    global _vllm_worker, _vllm_worker_loop
+    loop = asyncio.get_running_loop()
     
-    if _vllm_worker is None:
-        _vllm_worker = VLLMWorker(base_url=base_url, model=model, timeout=timeout)
-        
-        # Verify vLLM is accessible
-        if not await _vllm_worker.health_check():
-            logger.warning("vLLM health check failed - service may not be running")
-            logger.warning("Start vLLM with: vllm serve <model-name>")
-        else:
-            models = await _vllm_worker.list_models()
-            logger.info(f"Available vLLM models: {models}")
+    if _vllm_worker is None or _vllm_worker_loop is not loop:
+        async with _get_init_lock():
+            if _vllm_worker is not None and _vllm_worker_loop is not loop:
+                stale, _vllm_worker = _vllm_worker, None
+                await _close_stale_worker(stale)
+            
+            # Another caller may have finished initializing while we waited
+            if _vllm_worker is None:
+                worker = VLLMWorker(base_url=base_url, model=model, timeout=timeout,
+                                    pretokenize=pretokenize, microbatch=microbatch)
+                
+                # Verify vLLM is accessible
+                if not await worker.health_check():
+                    logger.warning("vLLM health check failed - service may not be running")
+                    logger.warning("Start vLLM with: vllm serve <model-name>")
+                else:
+                    models = await worker.list_models()
+                    logger.info(f"Available vLLM models: {models}")
+                
+                _vllm_worker = worker
+                _vllm_worker_loop = loop
     
     return _vllm_worker
 
 
 async def close_vllm_worker():
     """Close the vLLM worker singleton"""
-    global _vllm_worker
-    if _vllm_worker is not None:
-        await _vllm_worker.close()
-        _vllm_worker = None
+    global _vllm_worker, _vllm_worker_loop
+    async with _get_init_lock():
+        if _vllm_worker is not None:
+            if _vllm_worker_loop is asyncio.get_running_loop():
+                await _vllm_worker.close()
+            else:
+                await _close_stale_worker(_vllm_worker)
+            _vllm_worker = None
+            _vllm_worker_loop = None